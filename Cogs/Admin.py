@@ -0,0 +1,482 @@
+import datetime
+import os
+import tracemalloc
+from typing import List, Optional
+
+import disnake
+import yaml
+from disnake.ext import commands, tasks
+
+from Modules.Database import Database
+from Modules.Instrumentation import CommandStats
+from Modules.Logger import _logger as log
+from Modules.MemoryTracker import MemoryTracker
+from Modules.MessageDispatcher import MessageDispatcher
+from Modules.Metrics import format_ms
+from Modules.Profiler import Profiler
+from Modules.Telemetry import Telemetry
+from Modules.Watchdog import Watchdog
+
+# --- Configuration Loading ---
+current_dir = os.path.dirname(os.path.abspath(__file__))
+config_path = os.path.join(current_dir, "..", "config.yml")
+config_path = os.path.normpath(config_path)
+
+with open(config_path, "r") as f:
+    config = yaml.safe_load(f)
+    ADMIN_USER_IDS = config.get("admin_user_ids", [])
+    ACTION_LOG_RETENTION_MONTHS = config.get("action_log_retention_months")
+    MEMORY_CONFIG = config.get("memory") or {}
+
+MEMORY_ACTIONS = [
+    "report",
+    "start tracemalloc",
+    "stop tracemalloc",
+    "reset baseline",
+    "dump snapshot",
+]
+
+
+async def is_admin(inter: disnake.ApplicationCommandInteraction) -> bool:
+    """Check if the user is an admin defined in the config."""
+    return inter.author.id in ADMIN_USER_IDS
+
+
+def parse_utc(value: Optional[str]) -> Optional[datetime.datetime]:
+    """Parse 'YYYY-MM-DD' or 'YYYY-MM-DD HH:MM' as UTC; raises ValueError"""
+    if not value:
+        return None
+    for fmt in ("%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return datetime.datetime.strptime(value.strip(), fmt).replace(
+                tzinfo=datetime.timezone.utc
+            )
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid date `{value}`, use YYYY-MM-DD or YYYY-MM-DD HH:MM")
+
+
+def code_block(lines: List[str], limit: int = 1024) -> str:
+    """Lines in a code block, dropping lines from the end so it fits `limit`"""
+    lines = list(lines)
+    while len(lines) > 1 and sum(len(line) + 1 for line in lines) + 7 > limit:
+        lines.pop()
+    return ("```\n" + "\n".join(lines))[: limit - 4] + "\n```"
+
+
+class AuditView(disnake.ui.View):
+    """Pages through audit results; each click runs one indexed query"""
+
+    def __init__(self, author_id: int, filters: dict, page_size: int, logs: list):
+        super().__init__(timeout=600)
+        self.author_id = author_id
+        self.filters = filters
+        self.page_size = page_size
+        self.logs = logs
+        self.page = 1
+        self.older.disabled = len(logs) < page_size
+
+    async def interaction_check(self, inter: disnake.MessageInteraction) -> bool:
+        return inter.author.id == self.author_id
+
+    def embed(self) -> disnake.Embed:
+        """Render the current page"""
+        lines = []
+        for entry in self.logs:
+            when = int(entry["created_at"].timestamp())
+            who = entry["username"] or "system"
+            message = entry["message"].replace("\n", " ")
+            if len(message) > 80:
+                message = message[:77] + "..."
+            lines.append(f"<t:{when}:f> `{entry['type']}` **{who}**: {message}")
+
+        embed = disnake.Embed(
+            title=f"🗂️ Audit log ({len(self.logs)} entries)",
+            description="\n".join(lines)[:4096],
+            color=disnake.Color.dark_teal(),
+        )
+        embed.set_footer(text=f"Page {self.page}")
+        return embed
+
+    @disnake.ui.button(label="Older ▶", style=disnake.ButtonStyle.secondary)
+    async def older(self, button: disnake.ui.Button, inter: disnake.MessageInteraction):
+        last = self.logs[-1]
+        logs = await Database.get_action_logs(
+            self.page_size, before=(last["created_at"], last["id"]), **self.filters
+        )
+        if logs:
+            self.logs = logs
+            self.page += 1
+        self.older.disabled = len(logs) < self.page_size
+        await inter.response.edit_message(embed=self.embed(), view=self)
+
+
+class AdminCog(commands.Cog):
+    """Admin-only maintenance and diagnostics."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.maintain_action_logs.start()
+        snapshot_minutes = MEMORY_CONFIG.get("snapshot_interval_minutes", 0)
+        if snapshot_minutes:
+            self.memory_snapshots.change_interval(minutes=snapshot_minutes)
+            self.memory_snapshots.start()
+
+    def cog_unload(self):
+        """Stop the background tasks when the cog is unloaded."""
+        self.maintain_action_logs.cancel()
+        self.memory_snapshots.cancel()
+
+    @tasks.loop(hours=24)
+    async def maintain_action_logs(self):
+        """Create next months' action_logs partitions and drop expired ones."""
+        try:
+            dropped = await Database.maintain_action_log_partitions(
+                ACTION_LOG_RETENTION_MONTHS
+            )
+            if dropped:
+                print(f"Dropped expired action log partitions: {', '.join(dropped)}")
+        except Exception as e:
+            print(f"Error maintaining action log partitions: {e}")
+
+    @maintain_action_logs.before_loop
+    async def before_maintain_action_logs(self):
+        await self.bot.wait_until_ready()
+
+    @tasks.loop(minutes=60)
+    async def memory_snapshots(self):
+        """Write the memory footprint (and a tracemalloc snapshot) to data/memory."""
+        try:
+            await MemoryTracker.dump(self.bot, MEMORY_CONFIG.get("keep_snapshots", 24))
+        except Exception as e:
+            print(f"Error writing memory snapshot: {e}")
+
+    @memory_snapshots.before_loop
+    async def before_memory_snapshots(self):
+        await self.bot.wait_until_ready()
+
+    @commands.slash_command(
+        name="audit",
+        description="Search the bot's action log",
+        default_member_permissions=disnake.Permissions(administrator=True),
+    )
+    @commands.check(is_admin)
+    @log()
+    async def audit(
+        self,
+        inter: disnake.ApplicationCommandInteraction,
+        user: disnake.User = commands.Param(
+            default=None, description="Only show actions by this user"
+        ),
+        log_type: str = commands.Param(
+            name="type", default=None, description="Only show this log type"
+        ),
+        since: str = commands.Param(
+            default=None, description="From (UTC) YYYY-MM-DD or YYYY-MM-DD HH:MM"
+        ),
+        until: str = commands.Param(
+            default=None, description="Until (UTC) YYYY-MM-DD or YYYY-MM-DD HH:MM"
+        ),
+        limit: int = commands.Param(
+            default=15, ge=1, le=25, description="Entries per page"
+        ),
+    ):
+        """Filter the action log by user, type and time range."""
+        try:
+            filters = {
+                "user_id": user.id if user else None,
+                "log_type": log_type,
+                "since": parse_utc(since),
+                "until": parse_utc(until),
+            }
+        except ValueError as e:
+            await inter.response.send_message(f"❌ {e}", ephemeral=True)
+            return
+
+        await inter.response.defer(ephemeral=True)
+
+        logs = await Database.get_action_logs(limit, **filters)
+        if not logs:
+            await inter.followup.send("❌ No matching log entries", ephemeral=True)
+            return
+
+        view = AuditView(inter.author.id, filters, limit, logs)
+        await inter.followup.send(embed=view.embed(), view=view, ephemeral=True)
+
+    @commands.slash_command(
+        name="stats",
+        description="Command latency and handler timings",
+        default_member_permissions=disnake.Permissions(administrator=True),
+    )
+    @commands.check(is_admin)
+    @log()
+    async def stats(
+        self,
+        inter: disnake.ApplicationCommandInteraction,
+        limit: int = commands.Param(
+            default=10, ge=1, le=20, description="Commands to show"
+        ),
+    ):
+        """Slowest commands by p95, message handlers, and DB/REST tails."""
+        embed = disnake.Embed(title="📊 Bot stats", color=disnake.Color.dark_teal())
+
+        rows = CommandStats.slowest(limit)
+        lines = [
+            f"{'command':<16} {'calls':>5} {'err':>3} {'p50':>6} {'p95':>6} "
+            f"{'p99':>6} {'db':>6} {'rest':>6}"
+        ]
+        for row in rows:
+            lines.append(
+                f"{row['name'][:16]:<16} {row['calls']:>5} {row['errors']:>3} "
+                f"{format_ms(row['p50']):>6} {format_ms(row['p95']):>6} "
+                f"{format_ms(row['p99']):>6} {format_ms(row['db_avg']):>6} "
+                f"{format_ms(row['rest_avg']):>6}"
+            )
+        embed.add_field(
+            name="Slowest commands (db/rest are averages)",
+            value=code_block(lines) if rows else "No commands recorded yet",
+            inline=False,
+        )
+
+        handlers = MessageDispatcher.stats()[:limit]
+        lines = [f"{'handler':<28} {'calls':>6} {'err':>3} {'avg':>6} {'max':>6}"]
+        for row in handlers:
+            lines.append(
+                f"{row['name'][:28]:<28} {row['calls']:>6} {row['errors']:>3} "
+                f"{format_ms(row['avg_ms']):>6} {format_ms(row['max_ms']):>6}"
+            )
+        embed.add_field(
+            name=f"Message handlers ({MessageDispatcher.messages_seen} messages seen)",
+            value=code_block(lines) if handlers else "No subscribers",
+            inline=False,
+        )
+
+        lines = []
+        for name in ("db_query", "rest_request", "command", "loop_stall"):
+            if name not in Telemetry.histograms:
+                continue
+            window = Telemetry.histograms[name].window(300)
+            lines.append(
+                f"{name:<13} n={window.count:<6} "
+                f"p50 {format_ms(window.percentile(50)):>6} "
+                f"p95 {format_ms(window.percentile(95)):>6} "
+                f"p99 {format_ms(window.percentile(99)):>6}"
+            )
+        if lines:
+            embed.add_field(
+                name="Last 5 minutes",
+                value="```\n" + "\n".join(lines) + "\n```",
+                inline=False,
+            )
+
+        stalls = list(Watchdog.stalls)[-5:]
+        if stalls:
+            lines = []
+            for stall in reversed(stalls):
+                took = (
+                    format_ms(stall["duration_ms"])
+                    if stall["duration_ms"] is not None
+                    else "slow"
+                )
+                where = (
+                    stall["command"] or stall["location"] or stall["stack"][-1][:150]
+                )
+                lines.append(
+                    f"<t:{int(stall['when'].timestamp())}:T> **{took}** {where}"
+                )
+            embed.add_field(
+                name=f"Event loop stalls ({Watchdog.stall_count} total)",
+                value="\n".join(lines)[:1024],
+                inline=False,
+            )
+
+        await inter.response.send_message(embed=embed, ephemeral=True)
+
+    @commands.slash_command(
+        name="profile",
+        description="Sample where the bot spends CPU time into a flamegraph file",
+        default_member_permissions=disnake.Permissions(administrator=True),
+    )
+    @commands.check(is_admin)
+    @log()
+    async def profile(
+        self,
+        inter: disnake.ApplicationCommandInteraction,
+        seconds: int = commands.Param(
+            default=None,
+            ge=1,
+            le=600,
+            description="How long to profile (default 30, or a 600s cap with a target)",
+        ),
+        target: str = commands.Param(
+            default=None,
+            description=(
+                "Only profile this command, message handler or function "
+                "(e.g. CTFModalPart2.callback)"
+            ),
+        ),
+        invocations: int = commands.Param(
+            default=5, ge=1, le=100, description="Stop after the target ran this often"
+        ),
+        interval_ms: int = commands.Param(
+            default=5, ge=1, le=100, description="Time between stack samples"
+        ),
+    ):
+        """Run the sampling profiler and attach the collapsed stacks."""
+        await inter.response.defer(ephemeral=True)
+        if seconds is None:
+            seconds = 600 if target else 30
+
+        try:
+            session = await Profiler.run(
+                self.bot, seconds, target, invocations, interval_ms
+            )
+        except ValueError as e:
+            await inter.edit_original_response(content=f"❌ {e}")
+            return
+
+        embed = disnake.Embed(
+            title=f"🔥 Profile of {session.target or 'the event loop'}",
+            color=disnake.Color.orange(),
+        )
+        busy = session.samples - session.idle
+        summary = (
+            f"Stopped after {session.reason} ({session.elapsed:.1f}s), "
+            f"{session.samples} samples every {interval_ms}ms"
+        )
+        if session.target:
+            summary += (
+                f"\n{session.completed} invocations finished, "
+                f"{sum(session.stacks.values())} samples inside them"
+            )
+        elif session.samples:
+            summary += f"\nLoop busy in {busy / session.samples:.0%} of samples"
+        embed.description = summary
+
+        total = sum(session.stacks.values())
+        if not total:
+            # Idle the whole run, or the target never ran while sampled
+            embed.add_field(name="Most self time", value="No samples collected")
+            await inter.edit_original_response(embed=embed)
+            return
+
+        lines = [f"{count / total:>4.0%} {label}" for label, count in session.top(10)]
+        embed.add_field(name="Most self time", value=code_block(lines), inline=False)
+        embed.set_footer(text=f"data/profiles/{session.path.name}")
+        await inter.edit_original_response(embed=embed, file=disnake.File(session.path))
+
+    @commands.slash_command(
+        name="memory",
+        description="Memory use, cache sizes and tracemalloc growth",
+        default_member_permissions=disnake.Permissions(administrator=True),
+    )
+    @commands.check(is_admin)
+    @log()
+    async def memory(
+        self,
+        inter: disnake.ApplicationCommandInteraction,
+        action: str = commands.Param(
+            default="report", choices=MEMORY_ACTIONS, description="What to do"
+        ),
+        top: int = commands.Param(
+            default=10, ge=1, le=25, description="Allocation sites to show"
+        ),
+    ):
+        """Report RSS, cached objects and the allocation sites that grew most."""
+        await inter.response.defer(ephemeral=True)
+
+        note = None
+        if action == "start tracemalloc":
+            if tracemalloc.is_tracing():
+                await MemoryTracker.reset_baseline()
+            else:
+                MemoryTracker.start_tracing(MEMORY_CONFIG.get("tracemalloc_frames", 1))
+            note = "tracemalloc started, growth is measured from now"
+        elif action == "stop tracemalloc":
+            MemoryTracker.stop_tracing()
+            note = "tracemalloc stopped"
+        elif action == "reset baseline":
+            if not tracemalloc.is_tracing():
+                await inter.edit_original_response(
+                    content="❌ tracemalloc is not running"
+                )
+                return
+            await MemoryTracker.reset_baseline()
+            note = "Baseline reset, growth is measured from now"
+        elif action == "dump snapshot":
+            path = await MemoryTracker.dump(
+                self.bot, MEMORY_CONFIG.get("keep_snapshots", 24)
+            )
+            note = (
+                f"Snapshot written to data/memory/{path.name}"
+                if path
+                else "Footprint written to data/memory/footprint.jsonl "
+                "(tracemalloc is off)"
+            )
+
+        footprint = MemoryTracker.footprint(self.bot)
+        rss = footprint["rss_bytes"]
+        embed = disnake.Embed(
+            title="🧠 Memory",
+            description=note,
+            color=disnake.Color.blurple(),
+        )
+        embed.add_field(
+            name="Process",
+            value=(f"RSS: **{rss / 2**20:.1f} MiB**\n" if rss is not None else "")
+            + f"Python blocks: {footprint['python_blocks']:,}"
+            + (
+                f"\nTraced: {footprint['traced_bytes'] / 2**20:.1f} MiB"
+                if footprint["traced_bytes"] is not None
+                else ""
+            ),
+        )
+        embed.add_field(
+            name="Cache",
+            value=(
+                f"Guilds: {footprint['guilds']:,}\n"
+                f"Members: {footprint['members']:,}\n"
+                f"Users: {footprint['users']:,}\n"
+                f"Channels: {footprint['channels']:,}\n"
+                f"Messages: {footprint['messages']:,}"
+            ),
+        )
+        views = footprint["views"]
+        embed.add_field(
+            name=f"Views ({sum(views.values())})",
+            value="\n".join(f"{name}: {n}" for name, n in views.most_common(10))
+            or "None",
+        )
+
+        if tracemalloc.is_tracing():
+            sites = await MemoryTracker.growth(top)
+            lines = [
+                f"{site['size_diff'] / 1024:>+9.1f} KiB "
+                f"{site['count_diff']:>+7} {site['where']}"
+                for site in sites
+            ]
+            since = MemoryTracker.baseline_at
+            embed.add_field(
+                name=(
+                    f"Growth since <t:{int(since.timestamp())}:R>"
+                    if since
+                    else "Growth"
+                ),
+                value=code_block(lines) if lines else "No allocations traced yet",
+                inline=False,
+            )
+        else:
+            embed.set_footer(text="Start tracemalloc to see allocation sites")
+
+        await inter.edit_original_response(embed=embed)
+
+    @profile.autocomplete("target")
+    async def profile_target_autocomplete(
+        self, inter: disnake.ApplicationCommandInteraction, current: str
+    ):
+        names = Profiler.targets(self.bot)
+        return [n for n in names if current.lower() in n.lower()][:25]
+
+
+def setup(bot):
+    bot.add_cog(AdminCog(bot))
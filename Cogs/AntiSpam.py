@@ -0,0 +1,168 @@
+import asyncio
+import os
+from collections import Counter
+from datetime import timedelta
+
+import disnake
+import yaml
+from disnake.ext import commands
+
+from Modules.BulkActions import BulkExecutor
+from Modules.MessageDispatcher import MessageDispatcher
+from Modules.SpamDetector import SpamDetector, Verdict
+
+# --- Configuration Loading ---
+current_dir = os.path.dirname(os.path.abspath(__file__))
+config_path = os.path.join(current_dir, "..", "config.yml")
+config_path = os.path.normpath(config_path)
+
+with open(config_path, "r") as f:
+    config = yaml.safe_load(f)
+    ANTISPAM = config.get("antispam") or {}
+    LOGGING_CHANNEL = config.get("logging_channel")
+
+
+class AntiSpamCog(commands.Cog):
+    """Times out spammers and raiders and cleans up after them."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.enabled = ANTISPAM.get("enabled", True)
+        self.engine = SpamDetector.from_config(ANTISPAM)
+        self.timeout_duration = timedelta(minutes=ANTISPAM.get("timeout_minutes", 10))
+        self.slowmode_seconds = ANTISPAM.get("slowmode_seconds", 10)
+        self.exempt_roles = set(ANTISPAM.get("exempt_roles") or [])
+        self.alert_channel_id = ANTISPAM.get("alert_channel_id") or LOGGING_CHANNEL
+        self.bulk = BulkExecutor()
+        self.verdicts = Counter()
+        self._tasks = set()
+
+        if self.enabled:
+            MessageDispatcher.subscribe("AntiSpam", self.on_guild_message, guild=True)
+
+    def cog_unload(self):
+        MessageDispatcher.unsubscribe("AntiSpam")
+        for task in self._tasks:
+            task.cancel()
+
+    def is_exempt(self, member) -> bool:
+        """Moderators, exempt roles and anything that isn't a member are skipped"""
+        if not isinstance(member, disnake.Member):
+            return True
+        if member.guild_permissions.manage_messages:
+            return True
+        return any(role.id in self.exempt_roles for role in member.roles)
+
+    async def on_guild_message(self, message: disnake.Message):
+        """Check every guild message; enforcement runs in the background"""
+        if self.is_exempt(message.author):
+            return
+        verdict = self.engine.check_message(message)
+        if verdict:
+            self.spawn(self.enforce(verdict, message.guild))
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: disnake.Member):
+        if not self.enabled or member.bot:
+            return
+        verdict = self.engine.check_join(member)
+        if verdict:
+            self.spawn(self.enforce(verdict, member.guild))
+
+    def spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def enforce(self, verdict: Verdict, guild: disnake.Guild):
+        """Act on a verdict and report it to the alert channel"""
+        self.verdicts[verdict.reason] += 1
+        try:
+            if verdict.reason == "channel flood":
+                actions = await self.slow_down(guild.get_channel(verdict.channel_id))
+            else:
+                # Authors come with their messages even when members aren't cached
+                authors = {
+                    message.author.id: message.author
+                    for message in verdict.messages
+                    if isinstance(message.author, disnake.Member)
+                }
+                members = [
+                    member
+                    for member in (
+                        guild.get_member(user_id) or authors.get(user_id)
+                        for user_id in verdict.user_ids
+                    )
+                    if member and not self.is_exempt(member)
+                ]
+                timed_out = await self.timeout_members(members, verdict.reason)
+                deleted = await self.delete_messages(verdict.messages)
+                actions = f"Timed out {timed_out}/{len(members)}, deleted {deleted}"
+            await self.alert(verdict, actions)
+        except Exception as e:
+            print(f"\033[31mAnti-spam enforcement failed: {e}\033[0m")
+
+    async def timeout_members(self, members: list, reason: str) -> int:
+        """Time out members concurrently under the guild's action limit"""
+        members = [member for member in members if not member.current_timeout]
+        if not members:
+            return 0
+
+        async def timeout(member: disnake.Member):
+            await member.timeout(
+                duration=self.timeout_duration, reason=f"Anti-spam: {reason}"
+            )
+
+        result = await self.bulk.run(members, timeout, route=members[0].guild.id)
+        return len(result.succeeded)
+
+    async def delete_messages(self, messages: list) -> int:
+        """Bulk delete the offending messages, one call per channel"""
+        by_channel = {}
+        for message in messages:
+            by_channel.setdefault(message.channel, []).append(message)
+
+        deleted = 0
+        for channel, channel_messages in by_channel.items():
+            try:
+                if len(channel_messages) > 1:
+                    await channel.delete_messages(channel_messages[-100:])
+                else:
+                    await channel_messages[0].delete()
+                deleted += len(channel_messages[-100:])
+            except disnake.HTTPException as e:
+                print(f"Anti-spam cleanup failed in #{channel}: {e}")
+        return deleted
+
+    async def slow_down(self, channel) -> str:
+        """Turn on slowmode for a flooded channel"""
+        if not isinstance(channel, disnake.TextChannel):
+            return "No action"
+        if channel.slowmode_delay >= self.slowmode_seconds:
+            return f"Slowmode already {channel.slowmode_delay}s"
+        try:
+            await channel.edit(
+                slowmode_delay=self.slowmode_seconds, reason="Anti-spam: channel flood"
+            )
+            return f"Slowmode set to {self.slowmode_seconds}s"
+        except disnake.HTTPException as e:
+            return f"Failed to set slowmode: {e}"
+
+    async def alert(self, verdict: Verdict, actions: str):
+        channel = self.bot.get_channel(self.alert_channel_id)
+        if not channel:
+            return
+        users = " ".join(f"<@{user_id}>" for user_id in list(verdict.user_ids)[:40])
+        embed = disnake.Embed(
+            title=f"🚨 Anti-spam: {verdict.reason}",
+            color=disnake.Color.red(),
+        )
+        if verdict.channel_id:
+            embed.add_field(name="Channel", value=f"<#{verdict.channel_id}>")
+        embed.add_field(name="Action", value=actions)
+        embed.add_field(name="Users", value=users or "none", inline=False)
+        await channel.send(embed=embed, allowed_mentions=disnake.AllowedMentions.none())
+
+
+def setup(bot):
+    bot.add_cog(AntiSpamCog(bot))
@@ -11,9 +11,12 @@ from disnake.ext import commands, tasks
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
+from Modules.Backup import Backup
 from Modules.CooldownManager import dynamic_cooldown
 from Modules.Database import Database
 from Modules.Logger import _logger as log
+from Modules.MessageDispatcher import MessageDispatcher
+from Modules.Tracing import traced
 
 # --- Configuration Loading ---
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -702,10 +705,16 @@ class CTFSheet(commands.Cog):
         """Initialize the CTF cog."""
         self.bot = bot
         self.check_ended_ctfs.start()
+        MessageDispatcher.subscribe(
+            "CTFSheet.announcements",
+            self.on_announcement_message,
+            channels=[ANNOUNCEMENT_CHANNEL_ID],
+        )
 
     def cog_unload(self):
         """Stop the background task when the cog is unloaded."""
         self.check_ended_ctfs.cancel()
+        MessageDispatcher.unsubscribe("CTFSheet.announcements")
 
     @tasks.loop(minutes=10)
     async def check_ended_ctfs(self):
@@ -824,7 +833,9 @@ class CTFSheet(commands.Cog):
             )
 
     @commands.slash_command(
-        name="sendrolebutton", hidden=True, default_member_permissions="manage_members"
+        name="sendrolebutton",
+        hidden=True,
+        default_member_permissions=disnake.Permissions(manage_roles=True),
     )
     @commands.check(can_use_backup_command)
     @log()
@@ -856,17 +867,89 @@ class CTFSheet(commands.Cog):
         )
         await inter.response.send_message(embed=embed, view=view)
 
-    @commands.Cog.listener("on_message")
-    async def on_announcement_message(self, message: disnake.Message):
-        """Listen for new messages in the announcement channel."""
-        # Ignore bots, DMs, and messages not in the announcement channel
-        if (
-            message.author.bot
-            or not message.guild
-            or message.channel.id != ANNOUNCEMENT_CHANNEL_ID
-        ):
+    @commands.slash_command(
+        name="backup",
+        description="Back up every bot table to a compressed archive",
+        default_member_permissions=disnake.Permissions(administrator=True),
+    )
+    @commands.check(can_use_backup_command)
+    @log(text="Database backup created", color=0x3498DB)
+    async def backup(self, inter: disnake.ApplicationCommandInteraction):
+        """Stream all tables through COPY into data/backups/."""
+        await inter.response.defer(ephemeral=True)
+        try:
+            manifest = await Backup.create()
+        except Exception as e:
+            print(f"\033[31mBackup failed: {e}\033[0m")
+            await inter.followup.send(f"❌ Backup failed: {e}", ephemeral=True)
             return
 
+        lines = [
+            f"`{table}`: {info['compressed_bytes'] / 1024:.1f} KiB"
+            for table, info in manifest["tables"].items()
+        ]
+        embed = disnake.Embed(
+            title=f"💾 {manifest['name']}",
+            description="\n".join(lines),
+            color=disnake.Color.blue(),
+        )
+        embed.set_footer(text=f"Took {manifest['seconds']}s")
+        await inter.followup.send(embed=embed, ephemeral=True)
+
+    @commands.slash_command(
+        name="restore",
+        description="Replace the bot's tables with a backup",
+        default_member_permissions=disnake.Permissions(administrator=True),
+    )
+    @commands.check(can_use_backup_command)
+    @log(text="Database restored from backup", color=0xE67E22)
+    async def restore(
+        self,
+        inter: disnake.ApplicationCommandInteraction,
+        name: str = commands.Param(description="Backup to restore"),
+        confirm: bool = commands.Param(
+            default=False, description="Set to True to overwrite the current data"
+        ),
+    ):
+        """Truncate the tables and COPY a backup back in, all in one transaction."""
+        if not confirm:
+            await inter.response.send_message(
+                f"⚠️ This replaces all bot data with `{name}`. "
+                "Run again with `confirm: True` to continue.",
+                ephemeral=True,
+            )
+            return
+
+        await inter.response.defer(ephemeral=True)
+        try:
+            manifest = await Backup.restore(name)
+        except FileNotFoundError as e:
+            await inter.followup.send(f"❌ {e}", ephemeral=True)
+            return
+        except Exception as e:
+            print(f"\033[31mRestore failed: {e}\033[0m")
+            await inter.followup.send(
+                f"❌ Restore failed, nothing was changed: {e}", ephemeral=True
+            )
+            return
+
+        await inter.followup.send(
+            f"✅ Restored {len(manifest['tables'])} tables from `{name}`",
+            ephemeral=True,
+        )
+
+    @restore.autocomplete("name")
+    async def restore_autocomplete(
+        self, inter: disnake.ApplicationCommandInteraction, current: str
+    ):
+        return [name for name in Backup.list_backups() if current in name][:25]
+
+    async def on_announcement_message(self, message: disnake.Message):
+        """Handle new messages in the announcement channel.
+
+        The message dispatcher only routes non-bot messages from the announcement
+        channel here.
+        """
         pending = await Database.get_pending_announcements()
 
         # Check if the message content matches any pending CTFs
@@ -885,6 +968,7 @@ class CTFSheet(commands.Cog):
 
 class SheetSetup:
     @staticmethod
+    @traced("sheets.createSheet")
     async def createSheet(title, categories):
         def _create_sheet_blocking():
             creds, _ = google.auth.default()
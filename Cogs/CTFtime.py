@@ -1,26 +1,54 @@
+import asyncio
 import datetime
+import time
 
 import disnake
 import requests
 from disnake.ext import commands
 
+from Modules.Tracing import Tracer, traced
+
 
 class CTFtimeAPI(commands.Cog):
     """Cog for fetching upcoming CTF events from CTFtime"""  # comments be like: [shocked]
 
+    # CTFtime data changes slowly; serve repeated lookups from memory
+    CACHE_TTL = 300
+    cache_hits = 0
+    cache_misses = 0
+
     def __init__(self, bot):
         self.bot = bot
+        self._cache = {}
+
+    @traced("ctftime.get_events")
+    async def get_events(self, start: int, finish: int = "", limit: int = 10):
+        """Fetch events from CTFtime API, cached for CACHE_TTL seconds"""
+        # `start` is usually "now", so round it to keep the key stable
+        key = (start - start % self.CACHE_TTL, finish, limit)
+        now = time.monotonic()
+        cached = self._cache.get(key)
+        if cached and cached[0] > now:
+            CTFtimeAPI.cache_hits += 1
+            Tracer.annotate("cache", "hit")
+            return cached[1]
+        CTFtimeAPI.cache_misses += 1
+        Tracer.annotate("cache", "miss")
 
-    def get_events(self, start: int, finish: int = "", limit: int = 10):
-        """Fetch events from CTFtime API"""
         url = "https://ctftime.org/api/v1/events/"
         params = {"limit": limit, "start": start}
         if finish:
             params["finish"] = finish
 
-        r = requests.get(url, params=params, timeout=10)
+        # requests is blocking, keep it off the event loop
+        with Tracer.span("ctftime.fetch", url=url, limit=limit):
+            r = await asyncio.to_thread(requests.get, url, params=params, timeout=10)
         r.raise_for_status()
-        return r.json()
+        events = r.json()
+
+        self._cache = {k: v for k, v in self._cache.items() if v[0] > now}
+        self._cache[key] = (now + self.CACHE_TTL, events)
+        return events
 
     @commands.slash_command(name="upcoming", description="Gets the upcoming CTFs")
     async def upcoming(self, inter, index: int = 0):
@@ -28,7 +56,7 @@ class CTFtimeAPI(commands.Cog):
         now = int(datetime.datetime.now().timestamp())
 
         try:
-            events = self.get_events(now, "", 10)
+            events = await self.get_events(now, "", 10)
 
             if not events:
                 await inter.response.send_message(
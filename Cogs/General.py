@@ -8,81 +8,73 @@ from disnake.ext import commands
 
 from Modules.CooldownManager import dynamic_cooldown
 from Modules.Logger import _logger as log
+from Modules.Metrics import format_ms
+from Modules.Telemetry import Telemetry
+
+LATENCY_METRICS = {
+    "gateway": "Gateway heartbeat",
+    "rest": "REST round trip",
+    "loop_lag": "Event loop lag",
+}
+PING_WINDOWS = {"1m": 60, "5m": 300, "60m": 3600}
 
 
 class GeneralCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self._help = None
 
     # --- Slash Commands ---
-    @log(text="Ping command was used", color=0x00FF00)
     @commands.slash_command(name="ping", description="Check bot latency and uptime")
     @dynamic_cooldown()
+    @log(text="Ping command was used", color=0x00FF00)
     async def ping(self, inter: disnake.ApplicationCommandInteraction):
-        # Create container
-        container = disnake.ui.View()
-
-        # Calculate initial metrics
-        start_time = time.perf_counter()
-        await inter.response.defer()
-        end_time = time.perf_counter()
-
-        api_latency = round((end_time - start_time) * 1000)
-        websocket_latency = round(self.bot.latency * 1000)
-
-        # Calculate uptime
-        current_time = time.time()
-        uptime = current_time - self.bot.launch_time
-        days = int(uptime // (24 * 3600))
-        hours = int((uptime % (24 * 3600)) // 3600)
-        minutes = int((uptime % 3600) // 60)
-        seconds = int(uptime % 60)
-        uptime_str = f"{days}d {hours}h {minutes}m {seconds}s"
-
-        # Create the container
-        container = f"""
-        **Bot Status**
-        API Latency: {api_latency}ms
-        WebSocket Latency: {websocket_latency}ms
-        Uptime: {uptime_str}
-        """
-
-        # Add refresh button
-        refresh_button = disnake.ui.Button(
-            style=disnake.ButtonStyle.green, label="Refresh", custom_id="refresh_ping"
+        # Everything comes from the telemetry histograms, so no round trip needed
+        view = disnake.ui.View()
+        view.add_item(
+            disnake.ui.Button(
+                style=disnake.ButtonStyle.green,
+                label="Refresh",
+                custom_id="refresh_ping",
+            )
         )
-        container.add_item(refresh_button)
-
-        # Send initial message with container and button
-        await inter.followup.send(container, view=container)
+        await inter.response.send_message(embed=self.status_embed(), view=view)
 
     @commands.Cog.listener("on_button_click")
     async def ping_button_handler(self, inter: disnake.MessageInteraction):
         if inter.component.custom_id != "refresh_ping":
             return
+        await inter.response.edit_message(embed=self.status_embed())
 
-        # Calculate new metrics
-        api_latency = round(self.bot.latency * 1000)
-        websocket_latency = round(self.bot.latency * 1000)
-
-        current_time = time.time()
-        uptime = current_time - self.bot.launch_time
+    def status_embed(self) -> disnake.Embed:
+        """Uptime plus latency percentiles over the last 1, 5 and 60 minutes"""
+        uptime = time.time() - self.bot.launch_time
         days = int(uptime // (24 * 3600))
         hours = int((uptime % (24 * 3600)) // 3600)
         minutes = int((uptime % 3600) // 60)
         seconds = int(uptime % 60)
         uptime_str = f"{days}d {hours}h {minutes}m {seconds}s"
 
-        # Update container
-        container = f"""
-        **Bot Status**
-        API Latency: {api_latency}ms
-        WebSocket Latency: {websocket_latency}ms
-        Uptime: {uptime_str}
-        """
-
-        # Update message with new container
-        await inter.response.edit_message(container)
+        embed = disnake.Embed(
+            title="🏓 Bot Status",
+            description=(
+                f"**Uptime:** {uptime_str}\n"
+                f"**WebSocket latency now:** {format_ms(self.bot.latency * 1000)}"
+            ),
+            color=disnake.Color.green(),
+        )
+        for name, label in LATENCY_METRICS.items():
+            rows = [f"{'':>4} {'p50':>7} {'p95':>7} {'p99':>7}"]
+            for window, seconds in PING_WINDOWS.items():
+                p = Telemetry.percentiles(name, seconds)
+                rows.append(
+                    f"{window:>4} {format_ms(p[50]):>7} "
+                    f"{format_ms(p[95]):>7} {format_ms(p[99]):>7}"
+                )
+            embed.add_field(
+                name=label, value="```\n" + "\n".join(rows) + "\n```", inline=False
+            )
+        return embed
 
     @log(text="Gif command was used", color=0xFF0000)
     @commands.slash_command(name="gif", description="gif.")
@@ -111,36 +103,135 @@ class GeneralCog(commands.Cog):
             f"THEM has been summoned **{count:,}** times!", ephemeral=False
         )
 
-    @log()
+    def help_catalog(self) -> "HelpCatalog":
+        """The rendered help pages, rebuilt only when extensions change"""
+        key = tuple(self.bot.extensions)
+        if self._help is None or self._help.key != key:
+            self._help = HelpCatalog(self.bot, key)
+        return self._help
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        # Commands are synced by now, so build the help pages ahead of time
+        self.help_catalog()
+
     @commands.slash_command(name="help", description="List all slash commands.")
     @dynamic_cooldown()
+    @log()
     async def help_slash(self, inter: disnake.ApplicationCommandInteraction):
         """Shows all available commands"""
-        help_text = "```\nAvailable Commands:\n"
+        catalog = self.help_catalog()
+        if not catalog.pages:
+            await inter.response.send_message("No commands available", ephemeral=True)
+            return
+
+        view = HelpView(catalog, inter.author.id)
+        await inter.response.send_message(
+            embed=view.current(), view=view, ephemeral=True
+        )
+
+
+class HelpCatalog:
+    """Slash commands grouped by cog and rendered into embed pages once"""
 
-        # Group commands by cog
-        cog_commands = {}
+    PAGE_SIZE = 10
 
-        for cmd in self.bot.application_commands:
-            if isinstance(
-                cmd, (commands.InvokableSlashCommand, commands.SubCommandGroup)
-            ):
+    def __init__(self, bot, key: tuple):
+        self.key = key
+        grouped = {}
+        for cmd in bot.application_commands:
+            if isinstance(cmd, commands.InvokableSlashCommand):
                 cog_name = cmd.cog_name or "No Category"
-                if cog_name not in cog_commands:
-                    cog_commands[cog_name] = []
-                # Get description, fallback to command name if no description
-                desc = getattr(cmd, "description", "") or "No description available"
-                cog_commands[cog_name].append(f"/{cmd.name}: {desc}")
-
-        # Format and add each category
-        for cog_name, cmds in sorted(cog_commands.items()):
-            if cmds:  # Only show categories that have commands
-                help_text += f"\n{cog_name}:\n"
-                for cmd in sorted(cmds):
-                    help_text += f"  {cmd}\n"
-
-        help_text += "```"
-        await inter.response.send_message(help_text, ephemeral=True)
+                grouped.setdefault(cog_name, []).extend(self._lines(cmd))
+
+        self.pages = {
+            cog_name: self._render(cog_name, sorted(lines))
+            for cog_name, lines in sorted(grouped.items())
+            if lines
+        }
+
+    @staticmethod
+    def _lines(cmd) -> list:
+        """One line per command, or per subcommand for command groups"""
+        if not cmd.children:
+            desc = cmd.description or "No description available"
+            return [f"**/{cmd.qualified_name}** — {desc}"]
+        lines = []
+        for child in cmd.children.values():
+            children = getattr(child, "children", None)
+            for sub in children.values() if children else [child]:
+                desc = sub.description or "No description available"
+                lines.append(f"**/{sub.qualified_name}** — {desc}")
+        return lines
+
+    def _render(self, cog_name: str, lines: list) -> list:
+        chunks = [
+            lines[i : i + self.PAGE_SIZE] for i in range(0, len(lines), self.PAGE_SIZE)
+        ]
+        pages = []
+        for number, chunk in enumerate(chunks, start=1):
+            embed = disnake.Embed(
+                title=f"📖 {cog_name}",
+                description="\n".join(chunk),
+                color=disnake.Color.blurple(),
+            )
+            embed.set_footer(text=f"Page {number}/{len(chunks)}")
+            pages.append(embed)
+        return pages
+
+
+class HelpView(disnake.ui.View):
+    """Cog selector plus page buttons over a HelpCatalog"""
+
+    def __init__(self, catalog: HelpCatalog, author_id: int):
+        super().__init__(timeout=300)
+        self.catalog = catalog
+        self.author_id = author_id
+        self.cog_name = next(iter(catalog.pages))
+        self.page = 0
+
+        self.select_cog.options = [
+            disnake.SelectOption(
+                label=cog_name, description=f"{len(pages)} page(s)", value=cog_name
+            )
+            for cog_name, pages in list(catalog.pages.items())[:25]
+        ]
+        self._update_buttons()
+
+    async def interaction_check(self, inter: disnake.MessageInteraction) -> bool:
+        return inter.author.id == self.author_id
+
+    def current(self) -> disnake.Embed:
+        return self.catalog.pages[self.cog_name][self.page]
+
+    def _update_buttons(self):
+        total = len(self.catalog.pages[self.cog_name])
+        self.previous.disabled = self.page == 0
+        self.next.disabled = self.page >= total - 1
+
+    async def _show(self, inter: disnake.MessageInteraction):
+        self._update_buttons()
+        await inter.response.edit_message(embed=self.current(), view=self)
+
+    @disnake.ui.string_select(placeholder="Choose a category")
+    async def select_cog(
+        self, select: disnake.ui.StringSelect, inter: disnake.MessageInteraction
+    ):
+        self.cog_name = select.values[0]
+        self.page = 0
+        await self._show(inter)
+
+    @disnake.ui.button(label="◀ Previous", style=disnake.ButtonStyle.secondary)
+    async def previous(
+        self, button: disnake.ui.Button, inter: disnake.MessageInteraction
+    ):
+        self.page -= 1
+        await self._show(inter)
+
+    @disnake.ui.button(label="Next ▶", style=disnake.ButtonStyle.secondary)
+    async def next(self, button: disnake.ui.Button, inter: disnake.MessageInteraction):
+        self.page += 1
+        await self._show(inter)
 
 
 def setup(bot):
@@ -1,15 +1,82 @@
-from datetime import timedelta
+import asyncio
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Optional
 
 import disnake
 from disnake.ext import commands
 
 # from Modules import logger
+from Modules.BulkActions import BulkExecutor, BulkResult
 from Modules.Database import Database  # For ticket solutions
+from Modules.Purge import PurgeJob
+
+EXCERPT_LENGTH = 200
+MESSAGE_LIMIT = 2000
+REFETCH_CONCURRENCY = 5
+BULK_MAX_TARGETS = 500
+# Excerpt stored for a solution whose message is gone, so it isn't refetched
+DELETED_EXCERPT = "(message deleted)"
+
+
+def solution_snapshot(message: disnake.Message) -> dict:
+    """Author, excerpt and link stored alongside a solution"""
+    content = " ".join(message.content.split())
+    if not content and message.attachments:
+        content = f"[{len(message.attachments)} attachment(s)]"
+    if len(content) > EXCERPT_LENGTH:
+        content = content[: EXCERPT_LENGTH - 3] + "..."
+    return {
+        "author_name": message.author.display_name,
+        "excerpt": content,
+        "jump_url": message.jump_url,
+    }
+
+
+def solution_category(channel) -> Optional[str]:
+    """Challenge category of a ticket, taken from its first forum tag"""
+    tags = getattr(channel, "applied_tags", None)
+    return tags[0].name.lower() if tags else None
+
+
+def paginate(header: str, lines: list, limit: int = MESSAGE_LIMIT) -> list:
+    """Split lines into messages no longer than `limit`"""
+    pages, current = [], header
+    for line in lines:
+        if len(line) > limit - len(header) - 1:
+            line = line[: limit - len(header) - 4] + "..."
+        if len(current) + len(line) + 1 > limit:
+            pages.append(current)
+            current = header
+        current += "\n" + line
+    pages.append(current)
+    return pages
+
+
+class PurgeView(disnake.ui.View):
+    """Cancel button shown while a purge runs"""
+
+    def __init__(self, job: PurgeJob):
+        super().__init__(timeout=None)
+        self.job = job
+
+    async def interaction_check(self, inter: disnake.MessageInteraction) -> bool:
+        return inter.permissions.manage_messages
+
+    @disnake.ui.button(label="Cancel", style=disnake.ButtonStyle.danger)
+    async def cancel(
+        self, button: disnake.ui.Button, inter: disnake.MessageInteraction
+    ):
+        self.job.cancel()
+        button.disabled = True
+        button.label = "Cancelling..."
+        await inter.response.edit_message(view=self)
 
 
 class ModerationCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.bulk = BulkExecutor()
 
     # @log(text="Purge command was used", color=0xFF0000)
     @commands.slash_command(
@@ -40,23 +107,8 @@ class ModerationCog(commands.Cog):
         def check(msg):
             return user is None or msg.author.id == user.id
 
-        # Delete messages
-        try:
-            deleted = await inter.channel.purge(
-                limit=amount,
-                check=check,
-            )
-
-            msg = f"Deleted {len(deleted)} message(s)"
-            if user:
-                msg += f" from {user.mention}"
-
-            await inter.followup.send(msg, ephemeral=True)
-
-        except disnake.Forbidden:
-            await inter.followup.send(
-                "I don't have permission to delete messages", ephemeral=True
-            )
+        job = PurgeJob(inter.channel, limit=amount, check=check)
+        await self.run_purge(inter, job)
 
     # @log(text="Purge (context menu) command was used", color=0xFF0000)
     @commands.message_command(
@@ -73,26 +125,43 @@ class ModerationCog(commands.Cog):
         """Deletes the selected message and all messages below it."""
         await inter.response.defer(ephemeral=True)
 
-        try:
-            # Purge messages after the target message, including the message itself.
-            # The `before` parameter is exclusive, so we find messages sent after the
-            # target message's creation time.
-            deleted = await inter.channel.purge(
-                limit=None,  # No l                                     imit, purge all applicable
-                after=message.created_at - timedelta(microseconds=1),
-                oldest_first=False,  # Not strictly necessary, but can be slightly more efficient
-            )
+        # Purge the target message and everything after it. `after` is
+        # exclusive, so start just before the target message was created.
+        job = PurgeJob(
+            inter.channel, after=message.created_at - timedelta(microseconds=1)
+        )
+        await self.run_purge(inter, job)
 
+    async def run_purge(self, inter: disnake.ApplicationCommandInteraction, job):
+        """Run a purge job, streaming its progress into the deferred response"""
+        if not job.claim():
             await inter.followup.send(
-                f"Deleted {len(deleted)} message(s).", ephemeral=True
+                "A purge is already running in this channel", ephemeral=True
             )
+            return
 
+        view = PurgeView(job)
+
+        async def progress(job):
+            await inter.edit_original_response(content=job.progress_text(), view=view)
+
+        try:
+            await progress(job)
+            await job.run(progress)
+            text = job.summary()
         except disnake.Forbidden:
-            await inter.followup.send(
-                "I don't have permission to delete messages.", ephemeral=True
-            )
+            text = "I don't have permission to delete messages"
         except disnake.HTTPException as e:
-            await inter.followup.send(f"Failed to delete messages: {e}", ephemeral=True)
+            text = f"Failed to delete messages: {e}"
+        finally:
+            view.stop()
+            job.release()
+
+        try:
+            await inter.edit_original_response(content=text, view=None)
+        except disnake.HTTPException:
+            # The interaction token expires after 15 minutes
+            await inter.channel.send(text, delete_after=30)
 
     @commands.slash_command(
         name="timeout",
@@ -137,6 +206,163 @@ class ModerationCog(commands.Cog):
                 f"Failed to timeout user: {str(e)}", ephemeral=True
             )
 
+    async def resolve_targets(
+        self,
+        inter: disnake.ApplicationCommandInteraction,
+        users: Optional[str],
+        role: Optional[disnake.Role],
+        joined_within: Optional[int],
+    ) -> tuple:
+        """Collect members from mentions/ids, a role and recent joins
+
+        Returns:
+            tuple: (members the author may act on, BulkResult holding the skips)
+        """
+        guild = inter.guild
+        targets = {}
+
+        # Without chunking at startup only members who joined since then are cached
+        if (role or joined_within) and not guild.chunked:
+            await guild.chunk()
+
+        ids = [int(i) for i in re.findall(r"\d{15,20}", users or "")]
+        if ids:
+            found = await guild.get_or_fetch_members(ids)
+            targets.update((member.id, member) for member in found)
+        if role:
+            targets.update((member.id, member) for member in role.members)
+        if joined_within:
+            since = datetime.now(timezone.utc) - timedelta(minutes=joined_within)
+            targets.update(
+                (member.id, member)
+                for member in guild.members
+                if member.joined_at and member.joined_at >= since
+            )
+
+        result = BulkResult()
+        if ids:
+            result.skipped["not in this server"] = len(set(ids) - targets.keys())
+
+        members = []
+        for member in targets.values():
+            if member.id in (inter.author.id, guild.me.id) or member == guild.owner:
+                result.skipped["yourself, the bot or the owner"] += 1
+            elif (
+                member.top_role >= inter.author.top_role and inter.author != guild.owner
+            ):
+                result.skipped["role higher than or equal to yours"] += 1
+            elif member.top_role >= guild.me.top_role:
+                result.skipped["role higher than or equal to the bot's"] += 1
+            else:
+                members.append(member)
+        return members, result
+
+    async def run_bulk(
+        self,
+        inter: disnake.ApplicationCommandInteraction,
+        verb: str,
+        members: list,
+        skipped: BulkResult,
+        confirm: bool,
+        action,
+    ):
+        """Preview or run a bulk action and reply with one aggregated result"""
+        if not members:
+            await inter.followup.send(
+                skipped.summary(verb) if skipped.skipped else "No members matched",
+                ephemeral=True,
+            )
+            return
+        if len(members) > BULK_MAX_TARGETS:
+            await inter.followup.send(
+                f"{len(members)} members matched, the limit is {BULK_MAX_TARGETS}",
+                ephemeral=True,
+            )
+            return
+        if not confirm:
+            preview = ", ".join(member.mention for member in members[:30])
+            if len(members) > 30:
+                preview += f" and {len(members) - 30} more"
+            await inter.followup.send(
+                f"⚠️ This will affect **{len(members)}** member(s): {preview}\n"
+                "Run again with `confirm: True` to continue.",
+                ephemeral=True,
+            )
+            return
+
+        result = await self.bulk.run(members, action, route=inter.guild.id)
+        result.skipped.update(skipped.skipped)
+        await inter.followup.send(result.summary(verb), ephemeral=True)
+
+    @commands.slash_command(
+        name="bulk_timeout",
+        description="Time out many members at once",
+        default_member_permissions=disnake.Permissions(moderate_members=True),
+    )
+    @commands.cooldown(1, 10, commands.BucketType.guild)
+    @commands.guild_only()
+    async def bulk_timeout(
+        self,
+        inter: disnake.ApplicationCommandInteraction,
+        duration: int = commands.Param(
+            description="Duration in minutes", ge=1, le=40320
+        ),
+        reason: str = commands.Param(description="Reason for timeout"),
+        users: str = commands.Param(default=None, description="Mentions or IDs"),
+        role: disnake.Role = commands.Param(
+            default=None, description="Everyone with this role"
+        ),
+        joined_within: int = commands.Param(
+            default=None,
+            ge=1,
+            le=10080,
+            description="Members who joined in the last N minutes",
+        ),
+        confirm: bool = commands.Param(
+            default=False, description="Set to True to apply, otherwise preview"
+        ),
+    ):
+        await inter.response.defer(ephemeral=True)
+        members, skipped = await self.resolve_targets(inter, users, role, joined_within)
+
+        async def timeout(member: disnake.Member):
+            await member.timeout(duration=timedelta(minutes=duration), reason=reason)
+
+        await self.run_bulk(inter, "Timed out", members, skipped, confirm, timeout)
+
+    @commands.slash_command(
+        name="bulk_kick",
+        description="Kick many members at once",
+        default_member_permissions=disnake.Permissions(kick_members=True),
+    )
+    @commands.cooldown(1, 10, commands.BucketType.guild)
+    @commands.guild_only()
+    async def bulk_kick(
+        self,
+        inter: disnake.ApplicationCommandInteraction,
+        reason: str = commands.Param(description="Reason for kick"),
+        users: str = commands.Param(default=None, description="Mentions or IDs"),
+        role: disnake.Role = commands.Param(
+            default=None, description="Everyone with this role"
+        ),
+        joined_within: int = commands.Param(
+            default=None,
+            ge=1,
+            le=10080,
+            description="Members who joined in the last N minutes",
+        ),
+        confirm: bool = commands.Param(
+            default=False, description="Set to True to apply, otherwise preview"
+        ),
+    ):
+        await inter.response.defer(ephemeral=True)
+        members, skipped = await self.resolve_targets(inter, users, role, joined_within)
+
+        async def kick(member: disnake.Member):
+            await member.kick(reason=reason)
+
+        await self.run_bulk(inter, "Kicked", members, skipped, confirm, kick)
+
     # TODO: make it select which challenge it's for
     # @log(text="Solution marked", color=0x00FF00)
     @commands.message_command(name="Solution")
@@ -156,6 +382,8 @@ class ModerationCog(commands.Cog):
                 message_id=message.id,
                 user_id=message.author.id,
                 marked_by=inter.author.id,
+                category=solution_category(inter.channel),
+                **solution_snapshot(message),
             )
 
             # Create a cleaner message reference
@@ -183,34 +411,125 @@ class ModerationCog(commands.Cog):
             )
             return
 
-        try:
-            solutions = await Database.get_solutions(channel_id=inter.channel.id)
-
-            if not solutions:
-                await inter.response.send_message(
-                    "No solutions have been marked yet", ephemeral=True
-                )
-                return
+        await inter.response.defer(ephemeral=True)
 
-            # Format solutions nicely
-            messages = []
-            for solution in solutions:
-                channel = inter.channel
-                message = await channel.fetch_message(solution["message_id"])
-                if message:
-                    message_link = f"https://discord.com/channels/{inter.guild.id}/{channel.id}/{message.id}"
-                    messages.append(f"[{message.content}]({message_link})")
+        solutions = await Database.get_solutions(channel_id=inter.channel.id)
+        if not solutions:
+            await inter.followup.send(
+                "No solutions have been marked yet", ephemeral=True
+            )
+            return
 
-            solutions_text = "\n".join(f"• {msg}" for msg in messages)
+        # Only rows marked before snapshots were stored need a trip to Discord
+        stale = [solution for solution in solutions if solution["excerpt"] is None]
+        if stale:
+            await self.refresh_solution_snapshots(inter.channel, stale)
 
-            await inter.response.send_message(
-                f"**Solutions in this channel:**\n{solutions_text}", ephemeral=True
+        lines = []
+        for solution in solutions:
+            jump_url = solution["jump_url"] or (
+                f"https://discord.com/channels/{inter.guild.id}"
+                f"/{solution['channel_id']}/{solution['message_id']}"
+            )
+            if solution["excerpt"] is None:
+                lines.append(f"• *message unavailable* ([jump]({jump_url}))")
+                continue
+            if solution["excerpt"] == DELETED_EXCERPT:
+                lines.append(f"• *message deleted* ([jump]({jump_url}))")
+                continue
+            author = disnake.utils.escape_markdown(solution["author_name"] or "unknown")
+            excerpt = disnake.utils.escape_markdown(solution["excerpt"])
+            lines.append(f"• **{author}**: {excerpt} ([jump]({jump_url}))")
+
+        for page in paginate("**Solutions in this channel:**", lines):
+            await inter.followup.send(page, ephemeral=True)
+
+    async def refresh_solution_snapshots(self, channel, solutions: list):
+        """Fetch stale solutions a few at a time and store their snapshots"""
+        semaphore = asyncio.Semaphore(REFETCH_CONCURRENCY)
+
+        async def refetch(solution):
+            async with semaphore:
+                try:
+                    message = await channel.fetch_message(solution["message_id"])
+                except disnake.NotFound:
+                    message = None
+                except disnake.HTTPException:
+                    # Possibly temporary, try again on the next /solutions
+                    return None
+            if message is None:
+                solution["excerpt"] = DELETED_EXCERPT
+            else:
+                solution.update(solution_snapshot(message))
+            return (
+                solution["id"],
+                solution["author_name"],
+                solution["excerpt"],
+                solution["jump_url"],
             )
 
-        except Exception as e:
+        results = await asyncio.gather(*(refetch(solution) for solution in solutions))
+        await Database.update_solution_snapshots([r for r in results if r])
+
+    @commands.slash_command(
+        name="leaderboard",
+        description="Top solution authors",
+    )
+    @commands.guild_only()
+    async def leaderboard(
+        self,
+        inter: disnake.ApplicationCommandInteraction,
+        period: str = commands.Param(
+            default="all", description="'all', 'month' or a month like 2025-01"
+        ),
+        category: str = commands.Param(
+            default=None, description="Only count this challenge category"
+        ),
+        limit: int = commands.Param(default=10, ge=1, le=25),
+    ):
+        """Rank users by marked solutions, read from the solution_stats aggregate."""
+        period = period.strip().lower()
+        if period == "month":
+            period = datetime.now(timezone.utc).strftime("%Y-%m")
+        elif period != Database.ALL_PERIODS and not re.fullmatch(
+            r"\d{4}-(0[1-9]|1[0-2])", period
+        ):
             await inter.response.send_message(
-                f"Failed to get solutions: {str(e)}", ephemeral=True
+                "❌ Period must be `all`, `month` or YYYY-MM", ephemeral=True
             )
+            return
+
+        rows = await Database.get_leaderboard(
+            period, category.lower() if category else Database.ALL_CATEGORIES, limit
+        )
+
+        title = "🏆 Solutions leaderboard"
+        if period != Database.ALL_PERIODS:
+            title += f" — {period}"
+        if category:
+            title += f" — {category}"
+
+        medals = {1: "🥇", 2: "🥈", 3: "🥉"}
+        lines = [
+            f"{medals.get(rank, f'`#{rank}`')} <@{row['user_id']}>"
+            f" — **{row['solves']}**"
+            for rank, row in enumerate(rows, start=1)
+        ]
+        embed = disnake.Embed(
+            title=title,
+            description="\n".join(lines) or "No solutions yet",
+            color=disnake.Color.gold(),
+        )
+        await inter.response.send_message(
+            embed=embed, allowed_mentions=disnake.AllowedMentions.none()
+        )
+
+    @leaderboard.autocomplete("category")
+    async def leaderboard_category_autocomplete(
+        self, inter: disnake.ApplicationCommandInteraction, current: str
+    ):
+        categories = await Database.get_solution_categories()
+        return [c for c in categories if current.lower() in c][:25]
 
 
 def setup(bot):
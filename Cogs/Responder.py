@@ -1,16 +1,25 @@
+import asyncio
 import datetime
 import os
 import random
 import re
 import time
+from collections import OrderedDict
 from datetime import datetime, timezone
 
 import disnake
 import yaml
-from disnake.ext import commands
+from disnake.ext import commands, tasks
 
-from Modules.Logger import log
+from Modules.ActionQueue import ActionQueue
+from Modules.BatchWriter import BatchWriter
+from Modules.CooldownManager import ScopedCooldown
 from Modules.Database import Database
+from Modules.DMArchive import DMArchive
+from Modules.Logger import _logger as log
+from Modules.MessageDispatcher import MessageDispatcher
+from Modules.ReplyTracker import ReplyTracker
+from Modules.TriggerEngine import TriggerEngine
 
 # Get the directory of the current script
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -23,8 +32,7 @@ config_path = os.path.normpath(config_path)
 
 with open(config_path, "r") as f:
     data = yaml.safe_load(f)
-    RESTRICTED = data.get("restricted_channels", [])
-    COOLDOWN = int(data.get("cooldown", 60))
+    RESTRICTED = set(data.get("restricted_channels", []))
 
 
 class MessageResponder(commands.Cog):
@@ -38,25 +46,97 @@ class MessageResponder(commands.Cog):
     )
     TARGET_GIF_URL = "https://tenor.com/view/them-ctf-scream-scream-if-you-love-them-the-rock-gif-5196550339096611233"
 
+    # DM auto-replies, built once
+    DM_HELLO_TEXT = "Hello! I received your DM. How can I help you?"
+    DM_HELP_TEXT = (
+        "Here are the commands you can use:\n"
+        "• `hello` - Say hello\n"
+        "• `info` - Get your user info\n"
+        "• `link` - Link your account via OAuth2"
+    )
+    INFO_CACHE_SIZE = 256
+
     def __init__(self, bot):
         self.bot = bot
-        self.last_trigger_time = 0
         self.them_emoji = "<:them:1410349269948436530>"
         # Read config
         with open(config_path, "r") as f:
             self.config = yaml.safe_load(f)
+        self.triggers = TriggerEngine.from_config(
+            self.config,
+            default={
+                "keywords": ["them"],
+                "emojis": [self.them_emoji],
+                "urls": [self.TARGET_GIF_URL],
+            },
+        )
+        self.cooldowns = ScopedCooldown.from_config(
+            (self.config.get("responder") or {}).get("cooldown")
+        )
+        self.replies = ReplyTracker(bot)
+        self.triggered = 0
+        self.outbound = ActionQueue(name="Responder outbound")
+
+        # DM commands: prefix -> handler, matched with one regex
+        self.dm_commands = {
+            "hello": self.dm_hello,
+            "help": self.dm_help,
+            "info": self.dm_info,
+        }
+        self.dm_command_re = re.compile(
+            "|".join(sorted(map(re.escape, self.dm_commands), key=len, reverse=True)),
+            re.IGNORECASE,
+        )
+        self._info_embeds = OrderedDict()
+        self.dm_writer = BatchWriter(Database.log_dms, name="DM log writer")
+
+        MessageDispatcher.subscribe("Responder.dm", self.handle_dm, dm=True)
+        # Bot messages are needed so the reply tracker sees our own messages
+        MessageDispatcher.subscribe(
+            "Responder.them", self.handle_them_message, guild=True, bots=True
+        )
 
     async def cog_load(self):
         """Called when the cog is loaded"""
+        self.outbound.start()
+        self.dm_writer.start()
+        if self.config.get("dm_archive_after_days"):
+            self.archive_old_dms.start()
         if self.config.get("read_dms_on_start", False):
             await self.fetch_missed_dms()
 
+    def cog_unload(self):
+        """Stop the outbound worker when the cog is unloaded"""
+        MessageDispatcher.unsubscribe("Responder.dm")
+        MessageDispatcher.unsubscribe("Responder.them")
+        self.outbound.stop()
+        self.archive_old_dms.cancel()
+        # Write out any buffered DMs before the cog goes away
+        asyncio.create_task(self.dm_writer.close())
+
+    @tasks.loop(hours=24)
+    async def archive_old_dms(self):
+        """Move old DMs out of dm_logs into the on-disk archive"""
+        try:
+            moved = await DMArchive.archive_older_than(
+                self.config["dm_archive_after_days"]
+            )
+            if moved:
+                print(f"Archived {moved} old DMs")
+        except Exception as e:
+            print(f"Error archiving DMs: {e}")
+
+    @archive_old_dms.before_loop
+    async def before_archive_old_dms(self):
+        await self.bot.wait_until_ready()
+
     async def fetch_missed_dms(self):
         """Fetch and save DMs that were received while bot was offline"""
         try:
             # Get timestamp of last logged DM
             last_dm = await Database.get_latest_dm_timestamp()
 
+            rows = []
             for dm_channel in self.bot.private_channels:
                 if isinstance(dm_channel, disnake.DMChannel):
                     # Fetch message history since last logged DM
@@ -64,140 +144,130 @@ class MessageResponder(commands.Cog):
                         limit=None, after=last_dm, oldest_first=True
                     ):
                         if not message.author.bot:
-                            await Database.log_dm(
-                                user_id=message.author.id,
-                                username=str(message.author),
-                                content=message.content,
-                                message_id=message.id,
-                                has_attachments=bool(message.attachments),
-                                attachment_count=len(message.attachments),
-                            )
+                            rows.append(self.dm_log_row(message))
+
+            # One bulk insert for the whole backlog
+            await Database.log_dms(rows)
             print("Successfully caught up on missed DMs")
         except Exception as e:
             print(f"Error fetching missed DMs: {e}")
 
     async def handle_them_message(self, message: disnake.Message):
-        # Check if message is a reply and contains "good"
-        if (
-            message.reference
-            and "good" in message.content.lower()
-            and not message.author.bot
-        ):
-            try:
-                # Get the message being replied to
-                replied_msg = await message.channel.fetch_message(
-                    message.reference.message_id
-                )
-                # Check if the replied message is from our bot
-                if replied_msg.author.id == self.bot.user.id:
-                    await message.add_reaction("❤️")
-            except (disnake.NotFound, disnake.Forbidden):
-                pass
-
-        # Return if message is from a bot or in restricted channel or DM
-        if (
-            message.author.bot
-            or message.channel.id in RESTRICTED
-            or isinstance(message.channel, disnake.DMChannel)
-        ):
+        # Cheap rejections first, before looking at the content at all
+        if message.author.bot:
+            # Remember our own messages so replies to them need no REST call
+            if message.author.id == self.bot.user.id:
+                self.replies.remember(message)
             return
 
-        content = message.content or ""
-
-        # Check if message contains "them" keyword (case insensitive)
-        has_keyword = any(
-            keyword in content.lower() for keyword in ["them", self.them_emoji]
-        )
+        # Check if message is a reply to the bot and contains "good"
+        if message.reference and "good" in message.content.lower():
+            if await self.replies.is_reply_to_bot(message):
+                self.outbound.react(message, "❤️")
 
-        # Check for exact target GIF URL
-        has_exact_gif_url = (
-            self.TARGET_GIF_URL in content
-            or any(
-                embed.image
-                and isinstance(embed.image.url, str)
-                and embed.image.url == self.TARGET_GIF_URL
-                for embed in message.embeds
-            )
-            or any(att.url == self.TARGET_GIF_URL for att in message.attachments)
-        )
+        # Return if message is in restricted channel (DMs never get here)
+        if message.channel.id in RESTRICTED:
+            return
 
-        # Check cooldown
-        time_since = time.time() - self.last_trigger_time
-        if time_since < COOLDOWN:
+        # Check the channel and guild cooldowns
+        now = time.monotonic()
+        guild_id = message.guild.id if message.guild else None
+        if not self.cooldowns.is_ready(message.channel.id, guild_id, now):
             return
 
-        if any([has_keyword, has_exact_gif_url]):
-            import random
+        # Keywords, emojis and GIF URLs are all matched by one compiled pattern
+        if self.triggers.match(message):
+            # Start the cooldown before any await so concurrent messages can't
+            # trigger twice
+            self.cooldowns.trigger(message.channel.id, guild_id, now)
+            self.triggered += 1
 
+            # Responses are queued so on_message never waits on Discord or the DB
             reaction_choice = random.randint(0, 4)
             match reaction_choice:
                 case 0:
-                    await message.channel.send(f"{self.them_emoji} :on: :top:")
+                    self.outbound.send(message.channel, f"{self.them_emoji} :on: :top:")
                 case 1:
-                    await message.channel.send("THEM?! ON?! TOP?!")
+                    self.outbound.send(message.channel, "THEM?! ON?! TOP?!")
                 case 2:
-                    await message.channel.send("THEM ON TOP")
+                    self.outbound.send(message.channel, "THEM ON TOP")
                 case 3:
-                    await message.channel.send(self.TARGET_GIF_URL)
+                    self.outbound.send(message.channel, self.TARGET_GIF_URL)
                 case 4:
-                    await message.add_reaction(self.them_emoji)
-                    await message.add_reaction("⬆️")
-                    await message.add_reaction("🔝")
+                    self.outbound.react(message, self.them_emoji, "⬆️", "🔝")
 
             # Increment the counter
-            await Database.increment_them_counter()
+            self.outbound.submit(
+                ("db", "them_counter"), Database.increment_them_counter
+            )
             print(
                 f"\033[34m{message.author.display_name} triggered THEM response\033[0m"
             )
-            self.last_trigger_time = time.time()
+
+    @staticmethod
+    def dm_log_row(message: disnake.Message) -> tuple:
+        """Build a dm_logs row, ordered like Database.DM_LOG_COLUMNS"""
+        return (
+            message.author.id,
+            str(message.author),
+            message.content,
+            message.id,
+            bool(message.attachments),
+            len(message.attachments),
+        )
 
     async def handle_dm(self, message):
         """Handle DM messages"""
+        # Logged in batches by the DM writer
+        self.dm_writer.add(self.dm_log_row(message))
+
+        command = self.dm_command_re.match(message.content)
+        if command:
+            await self.dm_commands[command.group(0).lower()](message)
+
+    async def dm_hello(self, message: disnake.Message):
+        await message.reply(self.DM_HELLO_TEXT)
+
+    async def dm_help(self, message: disnake.Message):
+        await message.reply(self.DM_HELP_TEXT)
+
+    async def dm_info(self, message: disnake.Message):
         user = message.author
-        content = message.content
-
-        print(f"DM from {user.name}: {content}")
-
-        # Log DM
-        await Database.log_dm(
-            user_id=user.id,
-            username=str(user),
-            content=content,
-            message_id=message.id,
-            has_attachments=bool(message.attachments),
-            attachment_count=len(message.attachments),
-        )
+        avatar_url = user.avatar.url if user.avatar else None
+        key = (user.id, str(user), avatar_url)
 
-        # Add auto-reply functionality here if needed
-        if content.lower().startswith("hello"):
-            await message.reply("Hello! I received your DM. How can I help you?")
-        elif content.lower().startswith("help"):
-            await message.reply(
-                "Here are the commands you can use:\n• `hello` - Say hello\n• `info` - Get your user info\n• `link` - Link your account via OAuth2"
-            )
-        elif content.lower().startswith("info"):
+        embed = self._info_embeds.get(key)
+        if embed is None:
             embed = disnake.Embed(title="Your Information", color=disnake.Color.blue())
             embed.add_field(name="Username", value=str(user))
             embed.add_field(name="User ID", value=user.id)
             embed.add_field(
                 name="Account Created", value=user.created_at.strftime("%Y-%m-%d")
             )
-            if user.avatar:
-                embed.set_thumbnail(url=user.avatar.url)
-            await message.reply(embed=embed)
-
-    @commands.Cog.listener()
-    async def on_message(self, message: disnake.Message):
-        # Handle DMs
-        if isinstance(message.channel, disnake.DMChannel):
-            if not message.author.bot:
-                await self.handle_dm(message)
-            return
+            if avatar_url:
+                embed.set_thumbnail(url=avatar_url)
+
+            self._info_embeds[key] = embed
+            if len(self._info_embeds) > self.INFO_CACHE_SIZE:
+                self._info_embeds.popitem(last=False)
+        else:
+            self._info_embeds.move_to_end(key)
 
-        # Handle server messages
-        await self.handle_them_message(message)
+        await message.reply(embed=embed)
 
     # Slash commands
+    @commands.slash_command(
+        name="responder_stats",
+        description="Show how reply-to-bot checks were answered",
+        default_member_permissions=disnake.Permissions(administrator=True),
+    )
+    @log()
+    async def responder_stats(self, inter: disnake.ApplicationCommandInteraction):
+        """Show reply lookup hit rates"""
+        await inter.response.send_message(
+            f"```\n{self.replies.summary()}\n```", ephemeral=True
+        )
+
     # @commands.slash_command(name="starry", description="ALSO TESTING")
     async def send_dm(
         self,
@@ -222,16 +292,21 @@ class MessageResponder(commands.Cog):
                 f"❌ Failed to send DM: {str(e)}", ephemeral=True
             )
 
+    @commands.slash_command(
+        name="dm_logs",
+        description="View recent DM logs",
+        default_member_permissions=disnake.Permissions(administrator=True),
+    )
     @log(text="DM logs command was used", color=0x00FF00)
-    # @commands.slash_command(
-    # name="dm_logs",
-    # description="View recent DM logs",
-    # default_member_permissions=disnake.Permissions(administrator=True),
-    # )
     async def dm_logs(
         self,
         inter: disnake.ApplicationCommandInteraction,
-        limit: int = commands.Param(description="Number of logs to show", default=10),
+        limit: int = commands.Param(
+            description="Number of logs per page", default=10, ge=1, le=25
+        ),
+        user: disnake.User = commands.Param(
+            default=None, description="Only show DMs from this user"
+        ),
     ):
         """View recent DM logs"""
         if inter.author.id != 733839959009525761:  # Keep the owner check
@@ -241,36 +316,195 @@ class MessageResponder(commands.Cog):
         await inter.response.defer(ephemeral=True)
 
         try:
-            logs = await Database.get_recent_dms(limit)
+            user_id = user.id if user else None
+            logs = await DMArchive.get_dm_page(limit, user_id=user_id)
 
             if not logs:
                 await inter.followup.send("❌ No DM logs found", ephemeral=True)
                 return
 
-            embed = disnake.Embed(
-                title=f"📬 Recent DM Logs ({len(logs)} messages)",
-                color=disnake.Color.blue(),
+            view = DMLogView(inter.author.id, limit, user_id, logs)
+            await inter.followup.send(embed=view.embed(), view=view, ephemeral=True)
+
+        except Exception as e:
+            await inter.followup.send(
+                f"❌ Error reading logs: {str(e)}", ephemeral=True
             )
 
-            log_text = []
-            for log in logs:
-                time_str = log["timestamp"].strftime("%m/%d %H:%M")
-                content_preview = log["content"][:50] + (
-                    "..." if len(log["content"]) > 50 else ""
-                )
-                attachments = " 📎" if log["has_attachments"] else ""
+    @commands.slash_command(
+        name="dm_search",
+        description="Search DM logs",
+        default_member_permissions=disnake.Permissions(administrator=True),
+    )
+    @log(text="DM search command was used", color=0x00FF00)
+    async def dm_search(
+        self,
+        inter: disnake.ApplicationCommandInteraction,
+        query: str = commands.Param(
+            description='Words to search for; "phrases", -exclude and or work'
+        ),
+        user: disnake.User = commands.Param(
+            default=None, description="Only search DMs from this user"
+        ),
+        limit: int = commands.Param(
+            description="Number of results per page", default=10, ge=1, le=25
+        ),
+    ):
+        """Full-text search over DM logs"""
+        if inter.author.id != 733839959009525761:  # Same owner check as dm_logs
+            await inter.response.send_message("no", ephemeral=True)
+            return
+
+        await inter.response.defer(ephemeral=True)
 
-                log_text.append(
-                    f"`{time_str}` **{log['username']}**:{attachments} {content_preview}"
-                )
+        try:
+            user_id = user.id if user else None
+            results = await Database.search_dms(query, limit, user_id=user_id)
+
+            if not results:
+                await inter.followup.send("❌ No matching DMs found", ephemeral=True)
+                return
 
-            embed.description = "\n".join(log_text)
-            await inter.followup.send(embed=embed, ephemeral=True)
+            view = DMSearchView(inter.author.id, query, limit, user_id, results)
+            await inter.followup.send(embed=view.embed(), view=view, ephemeral=True)
 
         except Exception as e:
             await inter.followup.send(
-                f"❌ Error reading logs: {str(e)}", ephemeral=True
+                f"❌ Error searching logs: {str(e)}", ephemeral=True
+            )
+
+
+class DMLogView(disnake.ui.View):
+    """Newer/older buttons for the DM log viewer; each click fetches one page"""
+
+    def __init__(self, author_id: int, page_size: int, user_id, logs: list):
+        super().__init__(timeout=600)
+        self.author_id = author_id
+        self.page_size = page_size
+        self.user_id = user_id
+        self.logs = logs
+        self.page = 0
+        self.newer.disabled = True
+        self.older.disabled = len(logs) < page_size
+
+    async def interaction_check(self, inter: disnake.MessageInteraction) -> bool:
+        return inter.author.id == self.author_id
+
+    def embed(self) -> disnake.Embed:
+        """Render the current page"""
+        embed = disnake.Embed(
+            title=f"📬 DM Logs ({len(self.logs)} messages)",
+            color=disnake.Color.blue(),
+        )
+
+        log_text = []
+        for entry in self.logs:
+            time_str = entry["timestamp"].strftime("%m/%d %H:%M")
+            content_preview = entry["content"][:50] + (
+                "..." if len(entry["content"]) > 50 else ""
             )
+            attachments = " 📎" if entry["has_attachments"] else ""
+
+            log_text.append(
+                f"`{time_str}` **{entry['username']}**:{attachments} {content_preview}"
+            )
+
+        embed.description = "\n".join(log_text)
+        embed.set_footer(text=f"Page {self.page + 1}")
+        return embed
+
+    @staticmethod
+    def cursor(entry: dict) -> tuple:
+        return entry["timestamp"], entry["id"]
+
+    @disnake.ui.button(label="◀ Newer", style=disnake.ButtonStyle.secondary)
+    async def newer(self, button: disnake.ui.Button, inter: disnake.MessageInteraction):
+        logs = await DMArchive.get_dm_page(
+            self.page_size, self.user_id, after=self.cursor(self.logs[0])
+        )
+        if logs:
+            self.logs = logs
+            self.page = max(self.page - 1, 0)
+            self.older.disabled = False
+        # A short page means we've reached the newest DMs
+        if len(logs) < self.page_size:
+            self.page = 0
+        self.newer.disabled = self.page == 0
+        await inter.response.edit_message(embed=self.embed(), view=self)
+
+    @disnake.ui.button(label="Older ▶", style=disnake.ButtonStyle.secondary)
+    async def older(self, button: disnake.ui.Button, inter: disnake.MessageInteraction):
+        logs = await DMArchive.get_dm_page(
+            self.page_size, self.user_id, before=self.cursor(self.logs[-1])
+        )
+        if logs:
+            self.logs = logs
+            self.page += 1
+            self.newer.disabled = False
+        self.older.disabled = len(logs) < self.page_size
+        await inter.response.edit_message(embed=self.embed(), view=self)
+
+
+class DMSearchView(disnake.ui.View):
+    """Previous/next buttons for DM search results; each click fetches one page"""
+
+    def __init__(
+        self, author_id: int, query: str, page_size: int, user_id, results: list
+    ):
+        super().__init__(timeout=600)
+        self.author_id = author_id
+        self.query = query
+        self.page_size = page_size
+        self.user_id = user_id
+        self.results = results
+        # Cursor each page started after; None for the first page
+        self.page_starts = [None]
+        self.previous.disabled = True
+        self.next.disabled = len(results) < page_size
+
+    async def interaction_check(self, inter: disnake.MessageInteraction) -> bool:
+        return inter.author.id == self.author_id
+
+    def embed(self) -> disnake.Embed:
+        """Render the current page"""
+        embed = disnake.Embed(
+            title=f"🔎 DM search: {self.query[:200]}",
+            color=disnake.Color.blue(),
+        )
+
+        lines = []
+        for result in self.results:
+            time_str = result["timestamp"].strftime("%m/%d/%y %H:%M")
+            attachments = " 📎" if result["has_attachments"] else ""
+            snippet = result["snippet"].replace("\n", " ")[:200]
+            lines.append(
+                f"`{time_str}` **{result['username']}**:{attachments} {snippet}"
+            )
+
+        embed.description = "\n".join(lines)[:4096]
+        embed.set_footer(text=f"Page {len(self.page_starts)}")
+        return embed
+
+    async def show(self, inter: disnake.MessageInteraction):
+        self.results = await Database.search_dms(
+            self.query, self.page_size, self.user_id, after=self.page_starts[-1]
+        )
+        self.previous.disabled = len(self.page_starts) == 1
+        self.next.disabled = len(self.results) < self.page_size
+        await inter.response.edit_message(embed=self.embed(), view=self)
+
+    @disnake.ui.button(label="◀ Previous", style=disnake.ButtonStyle.secondary)
+    async def previous(
+        self, button: disnake.ui.Button, inter: disnake.MessageInteraction
+    ):
+        self.page_starts.pop()
+        await self.show(inter)
+
+    @disnake.ui.button(label="Next ▶", style=disnake.ButtonStyle.secondary)
+    async def next(self, button: disnake.ui.Button, inter: disnake.MessageInteraction):
+        last = self.results[-1]
+        self.page_starts.append((last["rank"], last["id"]))
+        await self.show(inter)
 
 
 def setup(bot):
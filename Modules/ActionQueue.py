@@ -0,0 +1,169 @@
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Hashable, Optional
+
+import disnake
+
+MAX_MESSAGE_LENGTH = 2000
+
+
+class RouteLimiter:
+    """Paces calls per route (GCRA): `rate` calls per `per` seconds, with bursts
+
+    Each route remembers when its next call is allowed. Reservations are made
+    synchronously before sleeping, so concurrent callers queue up fairly without
+    a lock. Idle routes are forgotten once they fall far enough behind.
+    """
+
+    def __init__(self, rate: int = 5, per: float = 5.0, burst: int = 1):
+        self.interval = per / rate
+        self.tolerance = self.interval * max(burst - 1, 0)
+        self._next = {}
+
+    def reserve(self, route: Hashable) -> float:
+        """Reserve a slot on the route and return how long to wait for it"""
+        now = time.monotonic()
+        if len(self._next) > 1024:
+            self._next = {r: t for r, t in self._next.items() if t > now}
+
+        theoretical = max(self._next.get(route, now), now)
+        self._next[route] = theoretical + self.interval
+        return max(theoretical - self.tolerance - now, 0.0)
+
+    async def acquire(self, route: Hashable):
+        """Wait until the route has capacity"""
+        delay = self.reserve(route)
+        if delay:
+            await asyncio.sleep(delay)
+
+
+class ActionQueue:
+    """Runs outbound Discord side effects off the event handler path.
+
+    Handlers enqueue actions and return immediately. A worker hands each action
+    to its route's lane, and every lane with work has its own task, so a route
+    waiting on its limiter never holds up the others. Plain text sends waiting
+    in a lane for the same channel are merged into one message. Routes are
+    `(kind, id)` tuples and are paced by the limiter for their kind; kinds
+    without a limiter are not paced.
+    """
+
+    # Discord allows about 5 messages per 5s and 4 reactions per second per channel
+    DEFAULT_LIMITS = {
+        "messages": (5, 5.0, 5),
+        "reactions": (4, 1.0, 1),
+    }
+
+    def __init__(
+        self,
+        limits: Optional[dict] = None,
+        max_size: int = 1000,
+        name: str = "ActionQueue",
+    ):
+        self.limiters = {
+            kind: RouteLimiter(*args)
+            for kind, args in {**self.DEFAULT_LIMITS, **(limits or {})}.items()
+        }
+        self.name = name
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+        self.max_size = max_size
+        self._worker: Optional[asyncio.Task] = None
+        # route -> actions waiting on it, and the task draining them
+        self._lanes: dict = {}
+        self._lane_tasks: dict = {}
+        self._backlog = 0
+        self.dropped = 0
+        self.coalesced = 0
+
+    def start(self):
+        """Start the worker task if it isn't running"""
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run(), name=self.name)
+
+    def stop(self):
+        """Cancel the workers; anything still queued is dropped"""
+        if self._worker:
+            self._worker.cancel()
+            self._worker = None
+        for task in list(self._lane_tasks.values()):
+            task.cancel()
+        self._lanes.clear()
+        self._lane_tasks.clear()
+        self._backlog = 0
+
+    def qsize(self) -> int:
+        return self._queue.qsize() + self._backlog
+
+    def _put(self, item: tuple):
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            print(f"\033[31m{self.name} full, dropping {item[0]} action\033[0m")
+
+    def send(self, channel: disnake.abc.Messageable, content: str):
+        """Queue a plain text message"""
+        self._put(("send", ("messages", channel.id), channel, content))
+
+    def react(self, message: disnake.Message, *emojis):
+        """Queue reactions, added in the given order"""
+        route = ("reactions", message.channel.id)
+        for emoji in emojis:
+            self._put(("call", route, message.add_reaction, (emoji,)))
+
+    def submit(self, route: Hashable, func: Callable[..., Awaitable], *args):
+        """Queue any coroutine function, run in order with others on `route`"""
+        self._put(("call", route, func, args))
+
+    async def _run(self):
+        while True:
+            self._assign(*await self._queue.get())
+
+    def _assign(self, kind: str, route: Hashable, target, payload):
+        """Append an action to its route's lane and make sure the lane runs"""
+        lane = self._lanes.get(route)
+        if lane is None:
+            lane = self._lanes[route] = deque()
+
+        # Merge into a text send to the same channel that hasn't gone out yet
+        if kind == "send" and lane and lane[-1][0] == "send":
+            previous = lane[-1]
+            joined = f"{previous[2]}\n{payload}"
+            if previous[1].id == target.id and len(joined) <= MAX_MESSAGE_LENGTH:
+                lane[-1] = (kind, target, joined)
+                self.coalesced += 1
+                return
+
+        if self._backlog >= self.max_size:
+            self.dropped += 1
+            print(f"\033[31m{self.name} full, dropping {kind} action\033[0m")
+            return
+        lane.append((kind, target, payload))
+        self._backlog += 1
+        if route not in self._lane_tasks:
+            self._lane_tasks[route] = asyncio.create_task(self._run_route(route, lane))
+
+    async def _run_route(self, route: Hashable, lane: deque):
+        """Run a lane's actions in order until it is empty, then retire it"""
+        route_kind = route[0] if isinstance(route, tuple) else route
+        limiter = self.limiters.get(route_kind)
+        try:
+            while lane:
+                if limiter:
+                    await limiter.acquire(route)
+                kind, target, payload = lane.popleft()
+                self._backlog -= 1
+                try:
+                    if kind == "send":
+                        await target.send(payload)
+                    else:
+                        await target(*payload)
+                except (disnake.NotFound, disnake.Forbidden):
+                    pass
+                except Exception as e:
+                    print(f"\033[31m{self.name} action on {route} failed: {e}\033[0m")
+        finally:
+            if self._lane_tasks.get(route) is asyncio.current_task():
+                del self._lanes[route]
+                del self._lane_tasks[route]
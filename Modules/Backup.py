@@ -0,0 +1,168 @@
+import asyncio
+import gzip
+import json
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional
+
+from .Database import Database
+
+
+class Backup:
+    """Streams bot tables to and from gzip-compressed COPY files.
+
+    A backup is a directory under data/backups/ holding one `<table>.copy.gz`
+    per table (Postgres binary COPY format) plus a manifest.json. Data moves in
+    COPY-sized chunks and compression runs in a worker thread, so memory stays
+    flat and the event loop never blocks on it. A pooled connection is used so
+    the bot's main connection stays free while a backup runs.
+    """
+
+    BACKUP_DIR = Database.DATA_DIR / "backups"
+    TABLES = [
+        "ctf_events",
+        "dm_logs",
+        "solutions",
+        "solution_stats",
+        "counters",
+        "active_ctf_buttons",
+        "pending_announcements",
+        "action_logs",
+    ]
+
+    @staticmethod
+    async def _columns(conn, table: str) -> List[str]:
+        """Columns that can be copied back in (generated columns are skipped)"""
+        rows = await conn.fetch(
+            """
+            SELECT column_name
+            FROM information_schema.columns
+            WHERE table_schema = 'public'
+                AND table_name = $1
+                AND is_generated = 'NEVER'
+            ORDER BY ordinal_position
+            """,
+            table,
+        )
+        return [row["column_name"] for row in rows]
+
+    @classmethod
+    def list_backups(cls) -> List[str]:
+        """Names of the available backups, newest first"""
+        if not cls.BACKUP_DIR.exists():
+            return []
+        return sorted(
+            (
+                p.name
+                for p in cls.BACKUP_DIR.iterdir()
+                if (p / "manifest.json").exists()
+            ),
+            reverse=True,
+        )
+
+    @classmethod
+    async def create(cls) -> dict:
+        """Back up every bot table; returns the manifest"""
+        started = time.perf_counter()
+        name = datetime.now(timezone.utc).strftime("backup-%Y%m%d-%H%M%S")
+        directory = cls.BACKUP_DIR / name
+        await asyncio.to_thread(directory.mkdir, parents=True, exist_ok=True)
+
+        manifest = {"name": name, "created_at": None, "tables": {}}
+        pool = await Database.get_pool()
+        async with pool.acquire() as conn:
+            # One snapshot for every table
+            async with conn.transaction(isolation="repeatable_read", readonly=True):
+                for table in cls.TABLES:
+                    manifest["tables"][table] = await cls._dump_table(
+                        conn, table, directory / f"{table}.copy.gz"
+                    )
+
+        manifest["created_at"] = datetime.now(timezone.utc).isoformat()
+        manifest["seconds"] = round(time.perf_counter() - started, 2)
+        await asyncio.to_thread(
+            (directory / "manifest.json").write_text, json.dumps(manifest, indent=2)
+        )
+        return manifest
+
+    @classmethod
+    async def _dump_table(cls, conn, table: str, path: Path) -> dict:
+        columns = await cls._columns(conn, table)
+        column_list = ", ".join(f'"{c}"' for c in columns)
+        output = await asyncio.to_thread(gzip.open, path, "wb")
+        written = 0
+
+        async def write(chunk: bytes):
+            nonlocal written
+            written += len(chunk)
+            await asyncio.to_thread(output.write, chunk)
+
+        try:
+            # COPY (SELECT ...) also works for the partitioned action_logs table
+            await conn.copy_from_query(
+                f"SELECT {column_list} FROM {table}", output=write, format="binary"
+            )
+        finally:
+            await asyncio.to_thread(output.close)
+
+        size = (await asyncio.to_thread(path.stat)).st_size
+        return {"columns": columns, "raw_bytes": written, "compressed_bytes": size}
+
+    @classmethod
+    async def restore(cls, name: str, chunk_size: int = 256 * 1024) -> dict:
+        """Replace the contents of every table in the backup, in one transaction"""
+        directory = cls.BACKUP_DIR / name
+        if (
+            directory.parent != cls.BACKUP_DIR
+            or not (directory / "manifest.json").exists()
+        ):
+            raise FileNotFoundError(f"No backup named {name}")
+
+        manifest = json.loads(
+            await asyncio.to_thread((directory / "manifest.json").read_text)
+        )
+        tables = manifest["tables"]
+
+        pool = await Database.get_pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(f"TRUNCATE {', '.join(tables)}")
+                for table, info in tables.items():
+                    await conn.copy_to_table(
+                        table,
+                        source=cls._read_chunks(
+                            directory / f"{table}.copy.gz", chunk_size
+                        ),
+                        columns=info["columns"],
+                        format="binary",
+                    )
+                    await cls._reset_sequence(conn, table, info["columns"])
+        return manifest
+
+    @staticmethod
+    async def _read_chunks(path: Path, chunk_size: int):
+        source = await asyncio.to_thread(gzip.open, path, "rb")
+        try:
+            while True:
+                chunk = await asyncio.to_thread(source.read, chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+        finally:
+            await asyncio.to_thread(source.close)
+
+    @staticmethod
+    async def _reset_sequence(conn, table: str, columns: List[str]):
+        """Point the id sequence past the restored rows"""
+        if "id" not in columns:
+            return
+        sequence: Optional[str] = await conn.fetchval(
+            "SELECT pg_get_serial_sequence($1, 'id')", table
+        )
+        if sequence:
+            await conn.execute(
+                f"SELECT setval($1, COALESCE((SELECT MAX(id) FROM {table}), 0) + 1, "
+                "false)",
+                sequence,
+            )
@@ -0,0 +1,145 @@
+import asyncio
+from typing import Awaitable, Callable, Optional
+
+
+class BatchWriter:
+    """Buffers rows in memory and writes them with one bulk call per batch.
+
+    A batch is flushed once `max_batch` rows are waiting or `max_delay` seconds
+    after the first row arrived, whichever comes first. If a flush fails the rows
+    are kept for the next attempt, up to `max_pending` rows. After `max_retries`
+    failures in a row the batch is written one row at a time, so a row the
+    database always rejects is dropped instead of blocking everything behind it.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[list], Awaitable[bool]],
+        max_batch: int = 100,
+        max_delay: float = 2.0,
+        max_pending: int = 10000,
+        max_retries: int = 3,
+        name: str = "BatchWriter",
+    ):
+        self._flush = flush
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+        self.name = name
+        self._rows: list = []
+        self._arrived = asyncio.Event()
+        self._full = asyncio.Event()
+        self._worker: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.flushes = 0
+        self.written = 0
+        self.dropped = 0
+        self.rejected = 0
+        self._failures = 0
+
+    def start(self):
+        """Start the background flusher if it isn't running"""
+        if self._worker is None or self._worker.done():
+            self._stopping = False
+            self._worker = asyncio.create_task(self._run(), name=self.name)
+
+    async def close(self):
+        """Stop the flusher and write whatever is still buffered
+
+        The flusher is woken up and awaited rather than cancelled, so a batch
+        that is being written finishes (or is put back) before the final flush.
+        """
+        if self._worker:
+            self._stopping = True
+            self._arrived.set()
+            self._full.set()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                # At shutdown the loop cancels every task, the flusher
+                # included; the final flush below still runs
+                if not self._worker.cancelled():
+                    raise
+            self._worker = None
+        await self.flush()
+
+    def add(self, row):
+        """Buffer one row; never waits on the database"""
+        if len(self._rows) >= self.max_pending:
+            self.dropped += 1
+            return
+        self._rows.append(row)
+        self._arrived.set()
+        if len(self._rows) >= self.max_batch:
+            self._full.set()
+
+    def pending(self) -> int:
+        return len(self._rows)
+
+    async def flush(self) -> bool:
+        """Write buffered rows now"""
+        if not self._rows:
+            return True
+
+        rows, self._rows = self._rows, []
+        self._arrived.clear()
+        self._full.clear()
+        try:
+            ok = await self._flush(rows)
+        except Exception as e:
+            print(f"\033[31m{self.name} flush failed: {e}\033[0m")
+            ok = False
+
+        if ok:
+            self._failures = 0
+            self.flushes += 1
+            self.written += len(rows)
+            return True
+
+        self._failures += 1
+        if self._failures >= self.max_retries:
+            rows = await self._write_singly(rows)
+        if rows:
+            # Keep the rows for the next flush, newest ones win if we overflow
+            self._rows = (rows + self._rows)[-self.max_pending :]
+            self._arrived.set()
+        return not rows
+
+    async def _write_singly(self, rows: list) -> list:
+        """Write rows one at a time and drop the ones that fail
+
+        If none of several rows can be written the database is more likely
+        down than the rows bad, so they are all returned to be kept.
+        """
+        failed = []
+        for row in rows:
+            try:
+                ok = await self._flush([row])
+            except Exception:
+                ok = False
+            if not ok:
+                failed.append(row)
+        self._failures = 0
+        if len(failed) == len(rows) > 1:
+            return rows
+
+        self.flushes += 1
+        self.written += len(rows) - len(failed)
+        self.rejected += len(failed)
+        for row in failed:
+            print(
+                f"\033[31m{self.name} dropped a row it can't write: {row!r:.200}\033[0m"
+            )
+        return []
+
+    async def _run(self):
+        while not self._stopping:
+            # Sleep until a batch starts, then until it fills up or times out
+            await self._arrived.wait()
+            try:
+                await asyncio.wait_for(self._full.wait(), timeout=self.max_delay)
+            except asyncio.TimeoutError:
+                pass
+            if not self._stopping:
+                await self.flush()
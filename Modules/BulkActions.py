@@ -0,0 +1,77 @@
+import asyncio
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Hashable, Iterable
+
+import disnake
+
+from .ActionQueue import RouteLimiter
+
+
+@dataclass
+class BulkResult:
+    """Aggregated outcome of one bulk action"""
+
+    succeeded: list = field(default_factory=list)
+    failed: Counter = field(default_factory=Counter)
+    skipped: Counter = field(default_factory=Counter)
+    elapsed: float = 0.0
+
+    def summary(self, verb: str) -> str:
+        """One message describing the whole run, e.g. summary("Timed out")"""
+        lines = [
+            f"✅ {verb} **{len(self.succeeded)}** member(s) in {self.elapsed:.1f}s"
+        ]
+        for reason, count in self.skipped.most_common():
+            lines.append(f"⏭️ Skipped {count}: {reason}")
+        for reason, count in self.failed.most_common(5):
+            lines.append(f"❌ Failed {count}: {reason}")
+        return "\n".join(lines)
+
+
+class BulkExecutor:
+    """Runs one moderation call per target, concurrently and rate limited
+
+    At most `concurrency` calls are in flight, and calls on the same route (the
+    guild) are paced by a RouteLimiter so a large batch doesn't run straight
+    into Discord's 429s. Failures are counted per error instead of aborting.
+    """
+
+    def __init__(
+        self,
+        rate: int = 5,
+        per: float = 2.0,
+        burst: int = 5,
+        concurrency: int = 10,
+    ):
+        self.limiter = RouteLimiter(rate, per, burst)
+        self.concurrency = concurrency
+
+    async def run(
+        self,
+        targets: Iterable,
+        action: Callable[..., Awaitable],
+        route: Hashable,
+    ) -> BulkResult:
+        """Await `action(target)` for every target"""
+        result = BulkResult()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        started = time.perf_counter()
+
+        async def run_one(target):
+            async with semaphore:
+                await self.limiter.acquire(route)
+                try:
+                    await action(target)
+                    result.succeeded.append(target)
+                except disnake.Forbidden:
+                    result.failed["missing permissions"] += 1
+                except disnake.NotFound:
+                    result.failed["not found"] += 1
+                except disnake.HTTPException as e:
+                    result.failed[e.text or str(e.status)] += 1
+
+        await asyncio.gather(*(run_one(target) for target in targets))
+        result.elapsed = time.perf_counter() - started
+        return result
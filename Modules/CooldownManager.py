@@ -92,3 +92,64 @@ def dynamic_cooldown():
         return wrapper
 
     return decorator
+
+
+class ScopedCooldown:
+    """Cooldowns keyed by channel and guild with lazy TTL eviction
+
+    A key is on cooldown until its expiry time. Expired keys are swept at most
+    once per `sweep_interval` seconds, so memory only holds recently active
+    channels and guilds.
+    """
+
+    def __init__(
+        self,
+        channel: float = 60,
+        guild: float = 0,
+        overrides: Optional[dict] = None,
+        sweep_interval: float = 300,
+    ):
+        self.channel = float(channel)
+        self.guild = float(guild)
+        self.overrides = {int(k): float(v) for k, v in (overrides or {}).items()}
+        self.sweep_interval = sweep_interval
+        self._expiry = {}
+        self._next_sweep = 0.0
+
+    @classmethod
+    def from_config(cls, config: Optional[dict]) -> "ScopedCooldown":
+        """Build from a mapping like `{channel: 60, guild: 15, channels: {id: s}}`"""
+        config = config or {}
+        return cls(
+            channel=config.get("channel", 60),
+            guild=config.get("guild", 0),
+            overrides=config.get("channels"),
+        )
+
+    def is_ready(self, channel_id: int, guild_id: Optional[int], now: float) -> bool:
+        """Check whether neither the channel nor the guild is on cooldown"""
+        if now >= self._next_sweep:
+            self._sweep(now)
+
+        expiry = self._expiry
+        if expiry.get(("channel", channel_id), 0) > now:
+            return False
+        if guild_id is not None and expiry.get(("guild", guild_id), 0) > now:
+            return False
+        return True
+
+    def trigger(self, channel_id: int, guild_id: Optional[int], now: float):
+        """Start the cooldown for the channel and its guild"""
+        channel_seconds = self.overrides.get(channel_id, self.channel)
+        if channel_seconds > 0:
+            self._expiry[("channel", channel_id)] = now + channel_seconds
+        if guild_id is not None and self.guild > 0:
+            self._expiry[("guild", guild_id)] = now + self.guild
+
+    def _sweep(self, now: float):
+        """Drop every expired key"""
+        self._expiry = {k: v for k, v in self._expiry.items() if v > now}
+        self._next_sweep = now + self.sweep_interval
+
+    def __len__(self):
+        return len(self._expiry)
@@ -0,0 +1,226 @@
+import asyncio
+import gzip
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from .Database import Database
+
+
+class DMArchive:
+    """Moves old DM logs out of Postgres into compressed, append-only segments.
+
+    Segments are monthly files under data/dm_archive/ (`dm_logs-YYYY-MM.jsonl.gz`).
+    Every archive batch is appended as its own gzip member, and index.json maps
+    each member's time range to its file, byte offset and length, so a reader
+    only decompresses the members that overlap the page it needs.
+    """
+
+    ARCHIVE_DIR = Database.DATA_DIR / "dm_archive"
+    INDEX_PATH = ARCHIVE_DIR / "index.json"
+    _index: Optional[List[dict]] = None
+
+    # --- Index ---
+
+    @classmethod
+    def _load_index(cls) -> List[dict]:
+        if cls._index is None:
+            try:
+                with open(cls.INDEX_PATH, "r") as f:
+                    cls._index = json.load(f)
+            except FileNotFoundError:
+                cls._index = []
+        return cls._index
+
+    @classmethod
+    def _save_index(cls, index: List[dict]):
+        """Write the index atomically, then swap it in for readers"""
+        tmp_path = cls.INDEX_PATH.with_suffix(".json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(index, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, cls.INDEX_PATH)
+        cls._index = index
+
+    @classmethod
+    def _last_archived(cls) -> Optional[tuple]:
+        """(timestamp, id) of the newest archived row"""
+        index = cls._load_index()
+        if not index:
+            return None
+        last = max(index, key=lambda e: (e["end"], e["last_id"]))
+        return datetime.fromisoformat(last["end"]), last["last_id"]
+
+    # --- Writing ---
+
+    @staticmethod
+    def _encode(row: dict) -> dict:
+        return {**row, "timestamp": row["timestamp"].isoformat()}
+
+    @staticmethod
+    def _decode(row: dict) -> dict:
+        return {**row, "timestamp": datetime.fromisoformat(row["timestamp"])}
+
+    @classmethod
+    def append(cls, rows: List[dict]):
+        """Append rows (oldest first) as new members of their monthly segments.
+
+        Blocking; run it in a thread.
+        """
+        cls.ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+        index = list(cls._load_index())
+
+        by_month = {}
+        for row in rows:
+            by_month.setdefault(row["timestamp"].strftime("%Y-%m"), []).append(row)
+
+        for month, month_rows in by_month.items():
+            name = f"dm_logs-{month}.jsonl.gz"
+            payload = "".join(
+                json.dumps(cls._encode(row)) + "\n" for row in month_rows
+            ).encode()
+            member = gzip.compress(payload)
+
+            with open(cls.ARCHIVE_DIR / name, "ab") as f:
+                offset = f.tell()
+                f.write(member)
+                f.flush()
+                os.fsync(f.fileno())
+
+            index.append(
+                {
+                    "file": name,
+                    "offset": offset,
+                    "length": len(member),
+                    "start": month_rows[0]["timestamp"].isoformat(),
+                    "end": month_rows[-1]["timestamp"].isoformat(),
+                    "first_id": month_rows[0]["id"],
+                    "last_id": month_rows[-1]["id"],
+                    "count": len(month_rows),
+                }
+            )
+
+        cls._save_index(index)
+
+    @classmethod
+    async def archive_older_than(cls, days: int, batch_size: int = 1000) -> int:
+        """Move DMs older than `days` from dm_logs into the archive
+
+        Rows are only deleted after their segment is fsynced. If a run dies in
+        between, the next run skips what is already archived and just deletes it.
+
+        Returns:
+            int: Number of rows moved
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+        moved = 0
+        while True:
+            rows = await Database.get_dms_before(cutoff, batch_size)
+            if not rows:
+                return moved
+
+            last = cls._last_archived()
+            new_rows = [
+                row
+                for row in rows
+                if last is None or (row["timestamp"], row["id"]) > last
+            ]
+            if new_rows:
+                await asyncio.to_thread(cls.append, new_rows)
+
+            if not await Database.delete_dms([row["id"] for row in rows]):
+                return moved
+            moved += len(new_rows)
+
+    # --- Reading ---
+
+    @classmethod
+    def _read_member(cls, entry: dict) -> List[dict]:
+        with open(cls.ARCHIVE_DIR / entry["file"], "rb") as f:
+            f.seek(entry["offset"])
+            data = gzip.decompress(f.read(entry["length"]))
+        return [cls._decode(json.loads(line)) for line in data.splitlines() if line]
+
+    @classmethod
+    def read_page(
+        cls,
+        limit: int,
+        user_id: Optional[int] = None,
+        before: Optional[tuple] = None,
+        after: Optional[tuple] = None,
+    ) -> List[dict]:
+        """Read archived DMs next to a (timestamp, id) cursor, newest first.
+
+        With `before` (or no cursor) returns the newest rows older than it; with
+        `after` returns the oldest rows newer than it. Blocking; run it in a
+        thread.
+        """
+        newer = after is not None and before is None
+        cursor = after if newer else before
+
+        entries = sorted(
+            cls._load_index(),
+            key=lambda e: (e["start"], e["first_id"]),
+            reverse=not newer,
+        )
+        found = []
+        for entry in entries:
+            # Members are read in time order, so once we have enough rows and the
+            # next member can't contain anything closer to the cursor, stop
+            if len(found) >= limit:
+                boundary = found[limit - 1]["timestamp"]
+                if newer and datetime.fromisoformat(entry["start"]) > boundary:
+                    break
+                if not newer and datetime.fromisoformat(entry["end"]) < boundary:
+                    break
+            if cursor is not None:
+                if newer and datetime.fromisoformat(entry["end"]) < cursor[0]:
+                    continue
+                if not newer and datetime.fromisoformat(entry["start"]) > cursor[0]:
+                    continue
+
+            for row in cls._read_member(entry):
+                if user_id is not None and row["user_id"] != user_id:
+                    continue
+                key = (row["timestamp"], row["id"])
+                if cursor is not None and (key <= cursor if newer else key >= cursor):
+                    continue
+                found.append(row)
+            found.sort(key=lambda r: (r["timestamp"], r["id"]), reverse=not newer)
+
+        page = found[:limit]
+        return page[::-1] if newer else page
+
+    @classmethod
+    async def get_dm_page(
+        cls,
+        limit: int = 10,
+        user_id: Optional[int] = None,
+        before: Optional[tuple] = None,
+        after: Optional[tuple] = None,
+    ) -> List[dict]:
+        """Database.get_dm_page that continues into the archive, newest first
+
+        Archived rows are always older than the ones still in dm_logs, so older
+        pages are topped up from the archive and newer pages start there.
+        """
+        if after is not None and before is None:
+            archived = await asyncio.to_thread(
+                cls.read_page, limit, user_id, after=after
+            )
+            if len(archived) >= limit:
+                return archived
+            hot = await Database.get_dm_page(
+                limit - len(archived), user_id=user_id, after=after
+            )
+            return hot + archived
+
+        page = await Database.get_dm_page(limit, user_id=user_id, before=before)
+        if len(page) < limit and cls._load_index():
+            cursor = (page[-1]["timestamp"], page[-1]["id"]) if page else before
+            page += await asyncio.to_thread(
+                cls.read_page, limit - len(page), user_id, before=cursor
+            )
+        return page
@@ -3,13 +3,16 @@ import os
 import platform
 import shutil
 import subprocess
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from pathlib import Path
 from typing import List, Optional
 
 import asyncpg
 from dotenv import load_dotenv
 
+from .Instrumentation import TimedConnection
+from .Tracing import Tracer
+
 load_dotenv()
 
 
@@ -75,11 +78,13 @@ class Database:
         while tries < max_tries:
             try:
                 await cls._create_default_user()
-                cls.conn = await asyncpg.connect(
-                    user=db_user,
-                    password=db_password,
-                    database=db_name,
-                    host=db_host,
+                cls.conn = TimedConnection(
+                    await asyncpg.connect(
+                        user=db_user,
+                        password=db_password,
+                        database=db_name,
+                        host=db_host,
+                    )
                 )
                 # Create all required tables
                 await cls._create_tables()
@@ -112,10 +117,12 @@ class Database:
 
         await cls.create_dm_log_table()
         await cls.create_solutions_table()
+        await cls.create_solution_stats_table()
         await cls.create_counters_table()
         await cls.create_ctfs_table()
         await cls.create_active_ctf_buttons_table()
         await cls.create_pending_announcements_table()
+        await cls.create_action_logs_table()
 
     @staticmethod
     def _is_postgres_installed():
@@ -282,6 +289,216 @@ class Database:
         """
         await cls.conn.execute(query)
 
+    @classmethod
+    async def create_action_logs_table(cls):
+        """Create the monthly range-partitioned action_logs table"""
+        query = """
+            CREATE TABLE IF NOT EXISTS action_logs (
+                id BIGSERIAL,
+                user_id BIGINT,
+                username TEXT,
+                message TEXT NOT NULL,
+                type TEXT NOT NULL,
+                priority INTEGER DEFAULT 0,
+                color INTEGER,
+                created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (id, created_at)
+            ) PARTITION BY RANGE (created_at);
+            -- Catches rows if the monthly partitions ever fall behind, so
+            -- logging keeps working; maintenance moves them out again
+            CREATE TABLE IF NOT EXISTS action_logs_default
+                PARTITION OF action_logs DEFAULT;
+            CREATE INDEX IF NOT EXISTS action_logs_type_created_idx
+                ON action_logs (type, created_at DESC, id DESC);
+            CREATE INDEX IF NOT EXISTS action_logs_user_created_idx
+                ON action_logs (user_id, created_at DESC, id DESC);
+            CREATE INDEX IF NOT EXISTS action_logs_created_idx
+                ON action_logs (created_at DESC, id DESC);
+        """
+        try:
+            await cls.conn.execute(query)
+            await cls.maintain_action_log_partitions()
+        except Exception as e:
+            print(f"Failed to create action_logs table: {e}")
+            raise
+
+    @staticmethod
+    def _month_start(day: date, offset: int = 0) -> date:
+        """First day of the month `offset` months away from `day`"""
+        months = day.year * 12 + day.month - 1 + offset
+        return date(months // 12, months % 12 + 1, 1)
+
+    @classmethod
+    async def maintain_action_log_partitions(
+        cls, retention_months: Optional[int] = None, months_ahead: int = 2
+    ) -> List[str]:
+        """Create upcoming monthly partitions and drop expired ones
+
+        Args:
+            retention_months: Keep this many past months; None keeps everything
+            months_ahead: How many future months to create partitions for
+
+        Returns:
+            List[str]: Names of the partitions that were dropped
+        """
+        # Runs on its own connection: the DETACH and the row move are
+        # transactions, and log inserts from other tasks on the shared
+        # connection would otherwise run (and roll back) inside them
+        pool = await cls.get_pool()
+        async with pool.acquire() as conn:
+            this_month = cls._month_start(datetime.now(timezone.utc).date())
+
+            for offset in range(months_ahead + 1):
+                start = cls._month_start(this_month, offset)
+                end = cls._month_start(start, 1)
+                await cls._create_action_log_partition(conn, start, end)
+
+            if retention_months is None:
+                return []
+
+            cutoff = cls._month_start(this_month, -retention_months)
+            partitions = await conn.fetch(
+                """
+                SELECT child.relname AS name
+                FROM pg_inherits
+                JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+                JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                WHERE parent.relname = 'action_logs'
+                """
+            )
+
+            dropped = []
+            for row in partitions:
+                name = row["name"]
+                try:
+                    month = datetime.strptime(name, "action_logs_y%Ym%m").date()
+                except ValueError:
+                    continue
+                if month < cutoff:
+                    # DETACH locks action_logs (ACCESS EXCLUSIVE) and log inserts
+                    # queue behind it. It is a quick catalog change, but waiting for
+                    # the lock could stall them, so give up after a moment and try
+                    # again next run. CONCURRENTLY isn't allowed with a default
+                    # partition. Dropping the detached table doesn't touch the parent.
+                    try:
+                        async with conn.transaction():
+                            await conn.execute("SET LOCAL lock_timeout = '2s'")
+                            await conn.execute(
+                                f"ALTER TABLE action_logs DETACH PARTITION {name}"
+                            )
+                    except asyncpg.LockNotAvailableError:
+                        print(f"action_logs busy, not dropping {name} this time")
+                        continue
+                    await conn.execute(f"DROP TABLE {name}")
+                    dropped.append(name)
+            return dropped
+
+    @classmethod
+    async def _create_action_log_partition(cls, conn, start: date, end: date):
+        """Create the partition for [start, end) if missing
+
+        Rows that landed in the default partition for this range are moved into
+        the new partition, since Postgres refuses to create it while they exist.
+        """
+        # Names and bounds are generated here, never from user input
+        name = f"action_logs_{start:y%Ym%m}"
+        bounds = f"FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        exists = await conn.fetchval("SELECT to_regclass($1)", name)
+        if exists:
+            return
+
+        strays = await conn.fetchval(
+            """
+            SELECT EXISTS (
+                SELECT 1 FROM action_logs_default
+                WHERE created_at >= $1 AND created_at < $2
+            )
+            """,
+            start,
+            end,
+        )
+        if not strays:
+            await conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF action_logs "
+                f"FOR VALUES {bounds}"
+            )
+            return
+
+        async with conn.transaction():
+            await conn.execute(
+                f"CREATE TABLE {name} (LIKE action_logs INCLUDING DEFAULTS)"
+            )
+            await conn.execute(
+                f"""
+                WITH moved AS (
+                    DELETE FROM action_logs_default
+                    WHERE created_at >= $1 AND created_at < $2
+                    RETURNING *
+                )
+                INSERT INTO {name} SELECT * FROM moved
+                """,
+                start,
+                end,
+            )
+            await conn.execute(
+                f"ALTER TABLE action_logs ATTACH PARTITION {name} FOR VALUES {bounds}"
+            )
+
+    @classmethod
+    async def get_action_logs(
+        cls,
+        limit: int = 20,
+        user_id: Optional[int] = None,
+        log_type: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        before: Optional[tuple] = None,
+    ) -> List[dict]:
+        """Get action logs newest first, filtered by user, type and time range
+
+        Time bounds prune whole partitions and the (user_id|type, created_at)
+        indexes serve each page directly, so the cost stays the same no matter
+        how much history is stored.
+
+        Args:
+            limit: Page size
+            user_id: Only logs for this user
+            log_type: Only logs of this type
+            since: Only logs at or after this time
+            until: Only logs before this time
+            before: (created_at, id) cursor of the last row of the previous page
+        """
+        conditions = []
+        args = []
+        for condition, value in (
+            ("user_id = ${}", user_id),
+            ("type = ${}", log_type),
+            ("created_at >= ${}", since),
+            ("created_at < ${}", until),
+        ):
+            if value is not None:
+                args.append(value)
+                conditions.append(condition.format(len(args)))
+        if before is not None:
+            args.extend(before)
+            conditions.append(f"(created_at, id) < (${len(args) - 1}, ${len(args)})")
+        args.append(limit)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"""
+            SELECT id, user_id, username, message, type, priority, color, created_at
+            FROM action_logs
+            {where}
+            ORDER BY created_at DESC, id DESC
+            LIMIT ${len(args)}
+        """
+        try:
+            rows = await cls.conn.fetch(query, *args)
+            return [dict(row) for row in rows]
+        except Exception as e:
+            print(f"Failed to get action logs: {e}")
+            return []
+
     @classmethod
     async def create_dm_log_table(cls):
         """Create the DM logs table if it doesn't exist"""
@@ -296,6 +513,16 @@ class Database:
                 has_attachments BOOLEAN DEFAULT FALSE,
                 attachment_count INTEGER DEFAULT 0
             );
+            -- Keyset pagination indexes for the DM log viewer
+            CREATE INDEX IF NOT EXISTS dm_logs_timestamp_id_idx
+                ON dm_logs (timestamp DESC, id DESC);
+            CREATE INDEX IF NOT EXISTS dm_logs_user_timestamp_id_idx
+                ON dm_logs (user_id, timestamp DESC, id DESC);
+            -- Full-text search over DM content
+            ALTER TABLE dm_logs ADD COLUMN IF NOT EXISTS content_tsv tsvector
+                GENERATED ALWAYS AS (to_tsvector('english', content)) STORED;
+            CREATE INDEX IF NOT EXISTS dm_logs_content_tsv_idx
+                ON dm_logs USING GIN (content_tsv);
         """
         try:
             await cls.conn.execute(query)
@@ -303,6 +530,66 @@ class Database:
             print(f"Failed to create dm_logs table: {e}")
             raise
 
+    # Leaderboard keys: period is 'all' or 'YYYY-MM', category ALL_CATEGORIES
+    # holds the totals across categories
+    ALL_PERIODS = "all"
+    ALL_CATEGORIES = "*"
+    UNCATEGORIZED = "uncategorized"
+
+    @classmethod
+    async def create_solution_stats_table(cls):
+        """Create the per-user solution aggregate, backfilling it if it's new"""
+        query = """
+            CREATE TABLE IF NOT EXISTS solution_stats (
+                period TEXT NOT NULL,
+                category TEXT NOT NULL,
+                user_id BIGINT NOT NULL,
+                solves INTEGER NOT NULL DEFAULT 0,
+                last_solve TIMESTAMPTZ NOT NULL,
+                PRIMARY KEY (period, category, user_id)
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_solution_stats_rank
+                ON solution_stats (period, category, solves DESC, last_solve);
+        """
+        try:
+            await cls.conn.execute(query)
+            if not await cls.conn.fetchval(
+                "SELECT EXISTS (SELECT 1 FROM solution_stats)"
+            ):
+                await cls.rebuild_solution_stats()
+        except Exception as e:
+            print(f"Failed to create solution_stats table: {e}")
+            raise
+
+    @classmethod
+    async def rebuild_solution_stats(cls):
+        """Recompute solution_stats from the full solutions history"""
+        query = """
+            INSERT INTO solution_stats (period, category, user_id, solves, last_solve)
+            SELECT k.period, k.category, s.user_id, COUNT(*), MAX(s.timestamp)
+            FROM solutions s
+            CROSS JOIN LATERAL (
+                VALUES
+                    ($1, $2),
+                    ($1, COALESCE(s.category, $3)),
+                    (to_char(s.timestamp AT TIME ZONE 'UTC', 'YYYY-MM'), $2),
+                    (
+                        to_char(s.timestamp AT TIME ZONE 'UTC', 'YYYY-MM'),
+                        COALESCE(s.category, $3)
+                    )
+            ) AS k(period, category)
+            GROUP BY k.period, k.category, s.user_id
+        """
+        # Transactions get their own connection, so queries other tasks run
+        # on the shared one don't end up inside them
+        pool = await cls.get_pool()
+        async with pool.acquire() as conn, conn.transaction():
+            await conn.execute("TRUNCATE solution_stats")
+            await conn.execute(
+                query, cls.ALL_PERIODS, cls.ALL_CATEGORIES, cls.UNCATEGORIZED
+            )
+
     @classmethod
     async def create_counters_table(cls):
         """Create the counters table if it doesn't exist"""
@@ -333,6 +620,16 @@ class Database:
                 marked_by BIGINT NOT NULL,
                 timestamp TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
             );
+
+            -- Snapshot of the message taken when it was marked, so /solutions
+            -- doesn't have to fetch every message back from Discord
+            ALTER TABLE solutions ADD COLUMN IF NOT EXISTS author_name TEXT;
+            ALTER TABLE solutions ADD COLUMN IF NOT EXISTS excerpt TEXT;
+            ALTER TABLE solutions ADD COLUMN IF NOT EXISTS jump_url TEXT;
+            ALTER TABLE solutions ADD COLUMN IF NOT EXISTS category TEXT;
+
+            CREATE INDEX IF NOT EXISTS idx_solutions_channel_timestamp
+                ON solutions (channel_id, timestamp DESC);
         """
         try:
             await cls.conn.execute(query)
@@ -380,6 +677,33 @@ class Database:
             print(f"Failed to log DM: {e}")
             return False
 
+    DM_LOG_COLUMNS = (
+        "user_id",
+        "username",
+        "content",
+        "message_id",
+        "has_attachments",
+        "attachment_count",
+    )
+
+    @classmethod
+    async def log_dms(cls, rows: List[tuple]) -> bool:
+        """Bulk insert DM log rows with a single COPY
+
+        Args:
+            rows: Tuples ordered like DM_LOG_COLUMNS
+        """
+        if not rows:
+            return True
+        try:
+            await cls.conn.copy_records_to_table(
+                "dm_logs", records=rows, columns=cls.DM_LOG_COLUMNS
+            )
+            return True
+        except Exception as e:
+            print(f"Failed to log {len(rows)} DMs: {e}")
+            return False
+
     @classmethod
     async def log_ctf(
         cls,
@@ -522,7 +846,7 @@ class Database:
         """
         try:
             rows = await cls.conn.fetch(query, limit)
-            result = [
+            return [
                 {
                     "timestamp": row["timestamp"],
                     "username": row["username"],
@@ -532,31 +856,220 @@ class Database:
                 for row in rows
             ]
         except Exception as e:
-            from Modules import log  # Import here to avoid circular dependency
-
-            # Log the error using the logger
-            log.log(text=f"Failed to get recent DMs: {e}", color=0xFF0000, type="ERROR")
             print(f"Failed to get recent DMs: {e}")
             return []
 
+    @classmethod
+    async def get_dm_page(
+        cls,
+        limit: int = 10,
+        user_id: Optional[int] = None,
+        before: Optional[tuple] = None,
+        after: Optional[tuple] = None,
+    ) -> List[dict]:
+        """Get one page of DM logs, newest first, using keyset pagination
+
+        Every page is a single index range scan on (timestamp, id), so the cost
+        doesn't grow with how far back you page.
+
+        Args:
+            limit: Page size
+            user_id: Only return DMs from this user
+            before: (timestamp, id) cursor; return DMs older than it
+            after: (timestamp, id) cursor; return DMs newer than it
+
+        Returns:
+            List[dict]: DM log entries ordered newest first
+        """
+        conditions = []
+        args = []
+        if user_id is not None:
+            args.append(user_id)
+            conditions.append(f"user_id = ${len(args)}")
+
+        # Walk the index forwards for newer pages and flip the result afterwards
+        newer = after is not None and before is None
+        cursor = after if newer else before
+        if cursor is not None:
+            args.extend(cursor)
+            op = ">" if newer else "<"
+            conditions.append(f"(timestamp, id) {op} (${len(args) - 1}, ${len(args)})")
+
+        args.append(limit)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        order = "ASC" if newer else "DESC"
+        query = f"""
+            SELECT id, user_id, username, content, message_id, timestamp,
+                has_attachments, attachment_count
+            FROM dm_logs
+            {where}
+            ORDER BY timestamp {order}, id {order}
+            LIMIT ${len(args)}
+        """
+        try:
+            rows = await cls.conn.fetch(query, *args)
+            page = [dict(row) for row in rows]
+            return page[::-1] if newer else page
+        except Exception as e:
+            print(f"Failed to get DM page: {e}")
+            return []
+
+    @classmethod
+    async def get_dms_before(cls, cutoff: datetime, limit: int = 1000) -> List[dict]:
+        """Get the oldest DM logs older than `cutoff`, oldest first
+
+        Args:
+            cutoff: Only return DMs logged before this time
+            limit: Maximum number of rows to return
+        """
+        query = """
+            SELECT id, user_id, username, content, message_id, timestamp,
+                has_attachments, attachment_count
+            FROM dm_logs
+            WHERE timestamp < $1
+            ORDER BY timestamp ASC, id ASC
+            LIMIT $2
+        """
+        try:
+            rows = await cls.conn.fetch(query, cutoff, limit)
+            return [dict(row) for row in rows]
+        except Exception as e:
+            print(f"Failed to get DMs before {cutoff}: {e}")
+            return []
+
+    @classmethod
+    async def delete_dms(cls, ids: List[int]) -> bool:
+        """Delete DM logs by id"""
+        try:
+            await cls.conn.execute("DELETE FROM dm_logs WHERE id = ANY($1::int[])", ids)
+            return True
+        except Exception as e:
+            print(f"Failed to delete {len(ids)} DMs: {e}")
+            return False
+
+    @classmethod
+    async def search_dms(
+        cls,
+        text: str,
+        limit: int = 10,
+        user_id: Optional[int] = None,
+        after: Optional[tuple] = None,
+    ) -> List[dict]:
+        """Full-text search DM logs, best matches first
+
+        Matches come from the GIN index on content_tsv; snippets are only built
+        for the rows on the returned page.
+
+        Args:
+            text: Search query, web search syntax ("quoted phrases", -exclude, or)
+            limit: Page size
+            user_id: Only search DMs from this user
+            after: (rank, id) cursor of the last result on the previous page
+
+        Returns:
+            List[dict]: Matches with rank and a highlighted snippet
+        """
+        args = [text]
+        conditions = ["d.content_tsv @@ q.query"]
+        if user_id is not None:
+            args.append(user_id)
+            conditions.append(f"d.user_id = ${len(args)}")
+        if after is not None:
+            args.extend(after)
+            conditions.append(
+                f"(ts_rank(d.content_tsv, q.query), d.id) "
+                f"< (${len(args) - 1}::real, ${len(args)})"
+            )
+        args.append(limit)
+
+        query = f"""
+            WITH q AS (SELECT websearch_to_tsquery('english', $1) AS query),
+            page AS (
+                SELECT d.id, d.user_id, d.username, d.content, d.timestamp,
+                    d.has_attachments, ts_rank(d.content_tsv, q.query) AS rank
+                FROM dm_logs d, q
+                WHERE {' AND '.join(conditions)}
+                ORDER BY rank DESC, d.id DESC
+                LIMIT ${len(args)}
+            )
+            SELECT page.id, page.user_id, page.username, page.timestamp,
+                page.has_attachments, page.rank,
+                ts_headline(
+                    'english', page.content, q.query,
+                    'StartSel=**, StopSel=**, MaxWords=20, MinWords=5, MaxFragments=1'
+                ) AS snippet
+            FROM page, q
+            ORDER BY page.rank DESC, page.id DESC
+        """
+        try:
+            rows = await cls.conn.fetch(query, *args)
+            return [dict(row) for row in rows]
+        except Exception as e:
+            print(f"Failed to search DMs: {e}")
+            return []
+
     @classmethod
     async def add_solution(
-        cls, channel_id: int, message_id: int, user_id: int, marked_by: int
+        cls,
+        channel_id: int,
+        message_id: int,
+        user_id: int,
+        marked_by: int,
+        author_name: Optional[str] = None,
+        excerpt: Optional[str] = None,
+        jump_url: Optional[str] = None,
+        category: Optional[str] = None,
     ) -> bool:
-        """Add a solution to the database
+        """Add a solution to the database and count it on the leaderboard
 
         Args:
             channel_id: The ID of the channel where the solution was marked
             message_id: The ID of the message which has the solution
             user_id: The ID of the user who provided the solution
             marked_by: The ID of the user who marked it as a solution
+            author_name: Display name of the message author
+            excerpt: Start of the message content
+            jump_url: Link to the message
+            category: Challenge category, if known
         """
-        query = """
-            INSERT INTO solutions (channel_id, message_id, user_id, marked_by)
-            VALUES ($1, $2, $3, $4)
+        insert_query = """
+            INSERT INTO solutions (
+                channel_id, message_id, user_id, marked_by,
+                author_name, excerpt, jump_url, category
+            )
+            VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+            RETURNING timestamp
+        """
+        stats_query = """
+            INSERT INTO solution_stats (period, category, user_id, solves, last_solve)
+            SELECT period, category, $1, 1, $2
+            FROM unnest($3::text[]) AS period, unnest($4::text[]) AS category
+            ON CONFLICT (period, category, user_id) DO UPDATE
+            SET solves = solution_stats.solves + 1,
+                last_solve = GREATEST(solution_stats.last_solve, EXCLUDED.last_solve)
         """
         try:
-            await cls.conn.execute(query, channel_id, message_id, user_id, marked_by)
+            pool = await cls.get_pool()
+            async with pool.acquire() as conn, conn.transaction():
+                timestamp = await conn.fetchval(
+                    insert_query,
+                    channel_id,
+                    message_id,
+                    user_id,
+                    marked_by,
+                    author_name,
+                    excerpt,
+                    jump_url,
+                    category,
+                )
+                month = timestamp.astimezone(timezone.utc).strftime("%Y-%m")
+                await conn.execute(
+                    stats_query,
+                    user_id,
+                    timestamp,
+                    [cls.ALL_PERIODS, month],
+                    [cls.ALL_CATEGORIES, category or cls.UNCATEGORIZED],
+                )
             print(
                 f"Solution added: channel_id={channel_id}, message_id={message_id}, user_id={user_id}, marked_by={marked_by}"
             )
@@ -573,30 +1086,84 @@ class Database:
             channel_id: The ID of the channel to get solutions for
 
         Returns:
-            List[dict]: List of solutions with message_id and marked_by information
+            List[dict]: Solutions, newest first. Rows marked before snapshots
+            were stored have excerpt set to None.
         """
         query = """
-            SELECT channel_id, message_id, user_id, marked_by, timestamp
+            SELECT id, channel_id, message_id, user_id, marked_by, timestamp,
+                author_name, excerpt, jump_url
             FROM solutions
             WHERE channel_id = $1
             ORDER BY timestamp DESC
         """
         try:
             rows = await cls.conn.fetch(query, channel_id)
-            return [
-                {
-                    "channel_id": row["channel_id"],
-                    "message_id": row["message_id"],
-                    "user_id": row["user_id"],
-                    "marked_by": row["marked_by"],
-                    "timestamp": row["timestamp"],
-                }
-                for row in rows
-            ]
+            return [dict(row) for row in rows]
         except Exception as e:
             print(f"Failed to get solutions: {e}")
             return []
 
+    @classmethod
+    async def get_leaderboard(
+        cls, period: str = ALL_PERIODS, category: str = ALL_CATEGORIES, limit: int = 10
+    ) -> List[dict]:
+        """Top solvers for a period ('all' or 'YYYY-MM') and category
+
+        Returns:
+            List[dict]: user_id, solves and last_solve, best first. Ties go to
+            whoever reached the count first.
+        """
+        query = """
+            SELECT user_id, solves, last_solve
+            FROM solution_stats
+            WHERE period = $1 AND category = $2
+            ORDER BY solves DESC, last_solve
+            LIMIT $3
+        """
+        try:
+            rows = await cls.conn.fetch(query, period, category, limit)
+            return [dict(row) for row in rows]
+        except Exception as e:
+            print(f"Failed to get leaderboard: {e}")
+            return []
+
+    @classmethod
+    async def get_solution_categories(cls) -> List[str]:
+        """Categories that have at least one solution"""
+        query = """
+            SELECT DISTINCT category
+            FROM solution_stats
+            WHERE period = $1 AND category <> $2
+            ORDER BY category
+        """
+        try:
+            rows = await cls.conn.fetch(query, cls.ALL_PERIODS, cls.ALL_CATEGORIES)
+            return [row["category"] for row in rows]
+        except Exception as e:
+            print(f"Failed to get solution categories: {e}")
+            return []
+
+    @classmethod
+    async def update_solution_snapshots(cls, snapshots: List[tuple]) -> bool:
+        """Backfill snapshots for solutions stored without one
+
+        Args:
+            snapshots: (id, author_name, excerpt, jump_url) tuples
+        """
+        if not snapshots:
+            return True
+        query = """
+            UPDATE solutions
+            SET author_name = $2, excerpt = $3, jump_url = $4
+            WHERE id = $1
+        """
+        try:
+            await cls.conn.executemany(query, snapshots)
+            return True
+        except Exception as e:
+            print(f"Failed to update solution snapshots: {e}")
+            return False
+
     @classmethod
     async def increment_them_counter(cls) -> bool:
         """Increment the 'them' counter by 1"""
@@ -624,12 +1191,6 @@ class Database:
             print(f"Failed to get them counter: {e}")
             return 0
 
-    async def get_them_counter(cls) -> int:
-        """Get the current value of the 'them' counter"""
-        query = "SELECT value FROM counters WHERE name = 'them_counter'"
-        try:
-            value = await cls.conn.fetchval(query)
-            return value or 0
-        except Exception as e:
-            print(f"Failed to get them counter: {e}")
-            return 0
+
+# One span per Database call, with the queries it ran as children
+Tracer.instrument(Database)
@@ -0,0 +1,83 @@
+from typing import Optional
+
+import disnake
+
+# Intents the bot's features actually use:
+# - guilds: channels, roles and threads
+# - guild_messages / dm_messages / message_content: THEM responder, DM logging,
+#   anti-spam, solutions and announcement detection
+# - members: on_member_join (raid detection) and member lookups for moderation
+MINIMAL_INTENTS = disnake.Intents(
+    guilds=True,
+    members=True,
+    guild_messages=True,
+    dm_messages=True,
+    message_content=True,
+)
+
+PROFILES = {
+    # Only what the features above need: members that join while the bot runs
+    # are cached, and a guild's full member list is only fetched when a bulk
+    # moderation command chunks it. Until then guild.members is incomplete,
+    # so look members up with get_or_fetch_member(s) rather than the cache
+    "minimal": {
+        "intents": MINIMAL_INTENTS,
+        "member_cache_flags": disnake.MemberCacheFlags(joined=True, voice=False),
+        "chunk_guilds_at_startup": False,
+        "max_messages": 200,
+    },
+    # Everything, as the bot originally ran: every member and presence
+    "full": {
+        "intents": disnake.Intents.all(),
+        "member_cache_flags": disnake.MemberCacheFlags.all(),
+        "chunk_guilds_at_startup": True,
+        "max_messages": 1000,
+    },
+}
+
+
+def _override(flags, overrides: Optional[dict]):
+    """Copy of `flags` with the named flags switched on or off"""
+    flags = type(flags)._from_value(flags.value)
+    for flag, enabled in (overrides or {}).items():
+        if flag not in flags.VALID_FLAGS:
+            raise ValueError(f"Unknown {type(flags).__name__} flag {flag!r}")
+        setattr(flags, flag, bool(enabled))
+    return flags
+
+
+def client_options(config: Optional[dict], profile: Optional[str] = None) -> dict:
+    """Keyword arguments for the bot from the `gateway:` config section
+
+    A profile supplies the defaults; `intents` and `member_cache` map flag
+    names to booleans on top of it, e.g. `intents: {presences: true}`.
+    `max_messages: 0` turns the message cache off.
+    """
+    config = config or {}
+    name = profile or config.get("profile", "full")
+    if name not in PROFILES:
+        raise ValueError(
+            f"Unknown gateway profile {name!r}, expected one of {', '.join(PROFILES)}"
+        )
+    base = PROFILES[name]
+
+    intents = _override(base["intents"], config.get("intents"))
+    member_cache_flags = _override(
+        base["member_cache_flags"], config.get("member_cache")
+    )
+    # Member caching needs the events that feed it
+    if not intents.members:
+        member_cache_flags.joined = False
+    if not intents.voice_states:
+        member_cache_flags.voice = False
+
+    max_messages = config.get("max_messages", base["max_messages"])
+    return {
+        "intents": intents,
+        "member_cache_flags": member_cache_flags,
+        "chunk_guilds_at_startup": config.get(
+            "chunk_guilds_at_startup", base["chunk_guilds_at_startup"]
+        )
+        and intents.members,
+        "max_messages": max_messages or None,
+    }
@@ -0,0 +1,191 @@
+import asyncio
+import time
+from contextvars import ContextVar
+from functools import wraps
+from typing import Dict, List, Optional
+
+from disnake.webhook.async_ import async_context
+
+from .Metrics import Histogram
+from .Profiler import Profiler
+from .Telemetry import Telemetry
+from .Tracing import Tracer
+
+# Time spent in the database and in Discord REST calls by the current command.
+# The dict is shared with tasks the command spawns, so their time counts too.
+_timings: ContextVar[Optional[dict]] = ContextVar("command_timings", default=None)
+
+
+def _add_time(kind: str, ms: float):
+    timings = _timings.get()
+    if timings is not None:
+        timings[kind] += ms
+
+
+class CommandStats:
+    """Call count, error count and wall/DB/REST time histograms per command"""
+
+    by_command: Dict[str, "CommandStats"] = {}
+    # Interactions whose command is running: [depth, name, timings, token, start]
+    _running: Dict[int, list] = {}
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.wall = Histogram()
+        self.db = Histogram()
+        self.rest = Histogram()
+
+    @classmethod
+    def get(cls, name: str) -> "CommandStats":
+        stats = cls.by_command.get(name)
+        if stats is None:
+            stats = cls.by_command[name] = cls()
+        return stats
+
+    @classmethod
+    def attach(cls, bot):
+        """Time every application command through the bot's invoke hooks
+
+        The hooks run in the task that runs the command, right before and after
+        its callback, so commands are timed whether or not they use @log.
+        """
+        for kind in ("slash_command", "user_command", "message_command"):
+            getattr(bot, f"before_{kind}_invoke")(cls._before_invoke)
+            getattr(bot, f"after_{kind}_invoke")(cls._after_invoke)
+
+    @classmethod
+    async def _before_invoke(cls, inter):
+        running = cls._running.get(inter.id)
+        if running is not None:
+            # A subcommand's hooks run again inside its parent's
+            running[0] += 1
+            return
+        timings = {"db": 0.0, "rest": 0.0}
+        cls._running[inter.id] = [
+            1,
+            inter.application_command.qualified_name,
+            timings,
+            _timings.set(timings),
+            time.perf_counter(),
+        ]
+
+    @classmethod
+    async def _after_invoke(cls, inter):
+        running = cls._running.get(inter.id)
+        if running is None:
+            return
+        running[0] -= 1
+        if running[0]:
+            return
+        del cls._running[inter.id]
+        _depth, name, timings, token, start = running
+        wall = (time.perf_counter() - start) * 1000
+        _timings.reset(token)
+
+        stats = cls.get(name)
+        stats.calls += 1
+        # disnake also marks a cancelled command as failed, that isn't an error
+        task = asyncio.current_task()
+        if inter.command_failed and not (task and task.cancelling()):
+            stats.errors += 1
+        stats.wall.observe(wall)
+        stats.db.observe(timings["db"])
+        stats.rest.observe(timings["rest"])
+        Telemetry.observe("command", wall)
+        Profiler.invoked(name)
+
+    @classmethod
+    def slowest(cls, limit: int = 10) -> List[dict]:
+        """Commands ordered by p95 wall time"""
+        rows = [
+            {
+                "name": name,
+                "calls": stats.calls,
+                "errors": stats.errors,
+                "p50": stats.wall.percentile(50),
+                "p95": stats.wall.percentile(95),
+                "p99": stats.wall.percentile(99),
+                "max": stats.wall.max,
+                "db_avg": stats.db.mean,
+                "rest_avg": stats.rest.mean,
+            }
+            for name, stats in cls.by_command.items()
+            if stats.calls
+        ]
+        rows.sort(key=lambda row: row["p95"] or 0, reverse=True)
+        return rows[:limit]
+
+
+class TimedConnection:
+    """Proxy for an asyncpg connection that times every query"""
+
+    TIMED = {
+        "execute",
+        "executemany",
+        "fetch",
+        "fetchrow",
+        "fetchval",
+        "copy_records_to_table",
+        "copy_to_table",
+        "copy_from_query",
+        "copy_from_table",
+    }
+
+    def __init__(self, conn):
+        self._conn = conn
+        # Queries started and not finished, for the metrics endpoint
+        self.in_flight = 0
+
+    def __getattr__(self, name):
+        attr = getattr(self._conn, name)
+        if name not in self.TIMED:
+            return attr
+
+        @wraps(attr)
+        async def timed(*args, **kwargs):
+            start = time.perf_counter()
+            self.in_flight += 1
+            try:
+                with Tracer.span(f"db.{name}") as span:
+                    if span.recording and args and isinstance(args[0], str):
+                        span.set("statement", " ".join(args[0].split())[:200])
+                    return await attr(*args, **kwargs)
+            finally:
+                self.in_flight -= 1
+                ms = (time.perf_counter() - start) * 1000
+                _add_time("db", ms)
+                Telemetry.observe("db_query", ms)
+
+        return timed
+
+
+def _timed(request):
+    """Wrap a `request(route, ...)` coroutine function to time each call"""
+
+    @wraps(request)
+    async def timed_request(route, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            with Tracer.span(f"discord {route.method} {route.path}"):
+                return await request(route, *args, **kwargs)
+        finally:
+            ms = (time.perf_counter() - start) * 1000
+            _add_time("rest", ms)
+            Telemetry.observe("rest_request", ms)
+
+    timed_request.__instrumented__ = True
+    return timed_request
+
+
+def instrument_http(bot):
+    """Time every Discord REST request the bot makes
+
+    Interaction responses and followups don't go through `bot.http` but
+    through disnake's shared webhook adapter, so that is wrapped as well.
+    """
+    if not getattr(bot.http.request, "__instrumented__", False):
+        bot.http.request = _timed(bot.http.request)
+    adapter = async_context.get()
+    if not getattr(adapter.request, "__instrumented__", False):
+        adapter.request = _timed(adapter.request)
@@ -10,6 +10,7 @@ import yaml
 from disnake.ext import commands
 
 from .Database import Database
+from .Tracing import Tracer
 
 LOGGING_CHANNEL = None
 ENABLE_CHANNEL_LOGGING = False
@@ -34,6 +35,8 @@ def load_config():
 
 class Logger:
     _instance = None
+    # Log writes that have started but not finished (DB insert and channel send)
+    in_flight = 0
 
     def __new__(cls, bot=None, **kwargs):
         if cls._instance is None:
@@ -55,6 +58,14 @@ class Logger:
             self._initialized = True
 
     async def log(self, text, color, type, priority, user=None):
+        Logger.in_flight += 1
+        try:
+            with Tracer.span("logger.log", type=type):
+                await self._write(text, color, type, priority, user)
+        finally:
+            Logger.in_flight -= 1
+
+    async def _write(self, text, color, type, priority, user=None):
         if ENABLE_LOG_TO_FILE:
             try:
                 query = """
@@ -68,7 +79,7 @@ class Logger:
                     text,
                     type,
                     priority,
-                    color,
+                    int(color) if color is not None else None,
                 )
             except Exception as e:
                 print(f"Failed to write log to database: {e}")
@@ -119,6 +130,20 @@ class Logger:
                 log_result=log_result,
             )
 
+        # Applied on top of a command decorator: wrap the command's callback so
+        # the command object itself is what ends up on the cog
+        if isinstance(func, commands.InvokableApplicationCommand):
+            func._callback = self.__call__(
+                func.callback,
+                text=text,
+                color=color,
+                type=type,
+                priority=priority,
+                log_args=log_args,
+                log_result=log_result,
+            )
+            return func
+
         log_color = color or self.default_color
         log_priority = priority or self.default_priority
 
@@ -141,32 +166,46 @@ class Logger:
                     return kwarg.author
             return None
 
+        def get_command_name(*args, **kwargs):
+            for arg in (*args, *kwargs.values()):
+                if isinstance(arg, disnake.ApplicationCommandInteraction):
+                    return arg.application_command.qualified_name
+            return func.__name__
+
         if inspect.iscoroutinefunction(func):
             @wraps(func)
             async def async_wrapper(*args, **kwargs):
                 user = get_user_from_args(*args, **kwargs)
+                name = get_command_name(*args, **kwargs)
 
-                if text or self.default_text:
-                    call_text = text or self.default_text
-                else:
-                    call_text = f"**/{func.__name__}** was ran"
-                    if args or kwargs:
-                        call_text += f" with the context: {args}, {kwargs}"
+                # Root span of the interaction: the log insert, the command's
+                # queries and its Discord calls all nest under it
+                with Tracer.span(f"/{name}", user_id=user.id if user else None):
+                    if text or self.default_text:
+                        call_text = text or self.default_text
+                    else:
+                        call_text = f"**/{func.__name__}** was ran"
+                        if args or kwargs:
+                            call_text += f" with the context: {args}, {kwargs}"
 
-                if log_args and (args or kwargs):
-                    call_text += f" with args: {args}, kwargs: {kwargs}"
+                    if log_args and (args or kwargs):
+                        call_text += f" with args: {args}, kwargs: {kwargs}"
 
-                await self.log(call_text, log_color, log_type, log_priority, user)
+                    await self.log(call_text, log_color, log_type, log_priority, user)
 
-                result = await func(*args, **kwargs)
+                    result = await func(*args, **kwargs)
 
-                if log_result:
-                    result_text = f"Function {func.__name__} returned: {result}"
-                    await self.log(
-                        result_text, log_color, f"{log_type}_RESULT", log_priority, user
-                    )
+                    if log_result:
+                        result_text = f"Function {func.__name__} returned: {result}"
+                        await self.log(
+                            result_text,
+                            log_color,
+                            f"{log_type}_RESULT",
+                            log_priority,
+                            user,
+                        )
 
-                return result
+                    return result
             return async_wrapper
         else:
             @wraps(func)
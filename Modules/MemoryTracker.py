@@ -0,0 +1,149 @@
+import asyncio
+import json
+import sys
+import tracemalloc
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional
+
+from .Metrics import rss_bytes
+
+ROOT = Path(__file__).resolve().parent.parent
+MEMORY_DIR = ROOT / "data" / "memory"
+
+# Allocations made by tracemalloc itself and the import machinery are noise
+SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+def _where(frame: tracemalloc.Frame) -> str:
+    path = Path(frame.filename)
+    if "site-packages" in path.parts:
+        name = "/".join(path.parts[path.parts.index("site-packages") + 1 :])
+    elif ROOT in path.parents:
+        name = str(path.relative_to(ROOT))
+    else:
+        name = path.name
+    return f"{name}:{frame.lineno}"
+
+
+class MemoryTracker:
+    """What the bot keeps in memory, and where memory has grown since a baseline
+
+    `footprint()` is cheap: RSS plus the sizes of disnake's caches (guilds,
+    members, users, messages) and the views it keeps listening for. Allocation
+    sites need tracemalloc, which slows every allocation down, so it only runs
+    after `start_tracing()` (from config at startup, or /memory). Growth is
+    measured against a baseline: the start of tracing, or a snapshot taken
+    when it is reset. Snapshots are taken in a thread.
+    """
+
+    _baseline: Optional[tracemalloc.Snapshot] = None
+    baseline_at: Optional[datetime] = None
+
+    @staticmethod
+    def footprint(bot) -> dict:
+        """RSS and cache sizes; reads in-memory state only"""
+        state = bot._connection
+        views = {}
+        for view, _item in getattr(state._view_store, "_views", {}).values():
+            views[view.id] = type(view).__name__
+
+        return {
+            "rss_bytes": rss_bytes(),
+            "guilds": len(bot.guilds),
+            "members": sum(len(guild.members) for guild in bot.guilds),
+            "users": len(bot.users),
+            "channels": sum(len(guild.channels) for guild in bot.guilds),
+            "messages": len(bot.cached_messages),
+            "views": Counter(views.values()),
+            "python_blocks": sys.getallocatedblocks(),
+            "traced_bytes": (
+                tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+            ),
+        }
+
+    @classmethod
+    def start_tracing(cls, frames: int = 1):
+        """Start tracemalloc; growth is measured from this point
+
+        Nothing is traced before tracemalloc starts, so the baseline is an
+        empty snapshot and this is safe to call before the event loop runs.
+        Use `reset_baseline()` when tracing is already on.
+        """
+        if tracemalloc.is_tracing():
+            return
+        tracemalloc.start(frames)
+        cls._baseline = tracemalloc.Snapshot((), frames)
+        cls.baseline_at = datetime.now(timezone.utc)
+
+    @classmethod
+    def stop_tracing(cls):
+        tracemalloc.stop()
+        cls._baseline = None
+        cls.baseline_at = None
+
+    @classmethod
+    async def reset_baseline(cls):
+        # A snapshot copies every traced block, keep it off the event loop
+        cls._baseline = await asyncio.to_thread(cls._snapshot)
+        cls.baseline_at = datetime.now(timezone.utc)
+
+    @staticmethod
+    def _snapshot() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+
+    @classmethod
+    async def growth(cls, limit: int = 10) -> List[dict]:
+        """Allocation sites that grew the most since the baseline"""
+        if not tracemalloc.is_tracing() or cls._baseline is None:
+            return []
+        baseline = cls._baseline
+
+        def compare():
+            diff = cls._snapshot().compare_to(baseline, "lineno")
+            return [
+                {
+                    "where": _where(stat.traceback[0]),
+                    "size": stat.size,
+                    "size_diff": stat.size_diff,
+                    "count_diff": stat.count_diff,
+                }
+                for stat in diff[:limit]
+            ]
+
+        # Comparing walks every traced block, keep it off the event loop
+        return await asyncio.to_thread(compare)
+
+    @classmethod
+    async def dump(cls, bot, keep: int = 24) -> Optional[Path]:
+        """Append the footprint to footprint.jsonl and save a snapshot file
+
+        Snapshot files can be loaded later with `tracemalloc.Snapshot.load()`
+        and compared offline; only the newest `keep` are kept.
+        """
+        now = datetime.now(timezone.utc)
+        footprint = cls.footprint(bot)
+        tracing = tracemalloc.is_tracing()
+
+        def write() -> Optional[Path]:
+            MEMORY_DIR.mkdir(parents=True, exist_ok=True)
+            with open(MEMORY_DIR / "footprint.jsonl", "a", encoding="utf-8") as f:
+                f.write(json.dumps({"time": now.isoformat(), **footprint}) + "\n")
+            if not tracing:
+                return None
+
+            snapshot = cls._snapshot()
+
+            path = MEMORY_DIR / f"{now:%Y%m%d-%H%M%S}.tracemalloc"
+            snapshot.dump(str(path))
+            for old in sorted(MEMORY_DIR.glob("*.tracemalloc"))[:-keep]:
+                old.unlink()
+            return path
+
+        return await asyncio.to_thread(write)
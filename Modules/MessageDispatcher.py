@@ -0,0 +1,187 @@
+import asyncio
+import re
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Iterable, Optional
+
+import disnake
+
+from .Profiler import Profiler
+
+
+@dataclass
+class Subscriber:
+    """A message handler plus the filters that decide when it wakes up"""
+
+    name: str
+    callback: Callable[[disnake.Message], Awaitable]
+    channels: frozenset = frozenset()
+    guild: bool = False
+    dm: bool = False
+    bots: bool = False
+    exclude_channels: frozenset = frozenset()
+    keywords: Optional[re.Pattern] = None
+
+    # Timing metrics
+    calls: int = 0
+    errors: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+
+    def wants(self, message: disnake.Message, channel_id: int) -> bool:
+        """Apply the per-subscriber filters that routing can't cover"""
+        if channel_id in self.exclude_channels:
+            return False
+        if self.keywords and not self.keywords.search(message.content or ""):
+            return False
+        return True
+
+
+class MessageDispatcher:
+    """The single on_message listener; routes each message to its subscribers.
+
+    Every message is classified once (DM or guild, channel, bot author) and only
+    subscribers registered for that DM/guild/channel scope are looked at.
+    Keyword subscribers additionally need one of their keywords in the content.
+    """
+
+    _bot = None
+    _subscribers: dict[str, Subscriber] = {}
+    _by_channel: dict[int, list[Subscriber]] = {}
+    _guild: list[Subscriber] = []
+    _dm: list[Subscriber] = []
+    messages_seen = 0
+    messages_routed = 0
+
+    @classmethod
+    def attach(cls, bot):
+        """Register the dispatcher as the bot's on_message listener"""
+        if cls._bot is bot:
+            return
+        cls._bot = bot
+        bot.add_listener(cls.dispatch, "on_message")
+
+    @classmethod
+    def subscribe(
+        cls,
+        name: str,
+        callback: Callable[[disnake.Message], Awaitable],
+        *,
+        channels: Iterable[int] = (),
+        guild: bool = False,
+        dm: bool = False,
+        bots: bool = False,
+        exclude_channels: Iterable[int] = (),
+        keywords: Iterable[str] = (),
+    ) -> Subscriber:
+        """Route messages to `callback`
+
+        Args:
+            name: Unique name, used for metrics and to unsubscribe
+            callback: Coroutine function called with the message
+            channels: Channel ids to receive messages from
+            guild: Receive messages from every guild channel
+            dm: Receive direct messages
+            bots: Also receive messages written by bots
+            exclude_channels: Channel ids to ignore, even with `guild`
+            keywords: Only receive messages containing one of these (any case)
+        """
+        channels = frozenset(channels)
+        if not (channels or guild or dm):
+            raise ValueError(f"Subscriber {name} needs channels, guild or dm")
+
+        keywords = sorted(set(keywords), key=len, reverse=True)
+        subscriber = Subscriber(
+            name=name,
+            callback=callback,
+            channels=channels,
+            guild=guild,
+            dm=dm,
+            bots=bots,
+            exclude_channels=frozenset(exclude_channels),
+            keywords=(
+                re.compile("|".join(map(re.escape, keywords)), re.IGNORECASE)
+                if keywords
+                else None
+            ),
+        )
+
+        cls._subscribers[name] = subscriber
+        cls._rebuild()
+        return subscriber
+
+    @classmethod
+    def unsubscribe(cls, name: str):
+        """Remove a subscriber by name"""
+        if cls._subscribers.pop(name, None):
+            cls._rebuild()
+
+    @classmethod
+    def _rebuild(cls):
+        """Recompute the routing tables; only runs when subscriptions change"""
+        by_channel: dict[int, list[Subscriber]] = {}
+        for subscriber in cls._subscribers.values():
+            # Guild-wide subscribers already see every channel, listing them
+            # per channel too would call them twice
+            if subscriber.guild:
+                continue
+            for channel_id in subscriber.channels:
+                by_channel.setdefault(channel_id, []).append(subscriber)
+        cls._by_channel = by_channel
+        cls._guild = [s for s in cls._subscribers.values() if s.guild]
+        cls._dm = [s for s in cls._subscribers.values() if s.dm]
+
+    @classmethod
+    async def dispatch(cls, message: disnake.Message):
+        cls.messages_seen += 1
+        channel_id = message.channel.id
+        is_bot = message.author.bot
+
+        if message.guild is None:
+            candidates = cls._dm
+        else:
+            candidates = cls._guild + cls._by_channel.get(channel_id, [])
+
+        targets = [
+            s
+            for s in candidates
+            if (s.bots or not is_bot) and s.wants(message, channel_id)
+        ]
+        if not targets:
+            return
+
+        cls.messages_routed += 1
+        if len(targets) == 1:
+            await cls._call(targets[0], message)
+        else:
+            await asyncio.gather(*(cls._call(s, message) for s in targets))
+
+    @staticmethod
+    async def _call(subscriber: Subscriber, message: disnake.Message):
+        start = time.perf_counter()
+        try:
+            await subscriber.callback(message)
+        except Exception as e:
+            subscriber.errors += 1
+            print(f"\033[31mMessage subscriber {subscriber.name} failed: {e}\033[0m")
+        finally:
+            elapsed = time.perf_counter() - start
+            subscriber.calls += 1
+            subscriber.total_time += elapsed
+            subscriber.max_time = max(subscriber.max_time, elapsed)
+            Profiler.invoked(subscriber.name)
+
+    @classmethod
+    def stats(cls) -> list[dict]:
+        """Per-subscriber call counts and timings, slowest average first"""
+        rows = [
+            {
+                "name": s.name,
+                "calls": s.calls,
+                "errors": s.errors,
+                "avg_ms": (s.total_time / s.calls * 1000) if s.calls else 0.0,
+                "max_ms": s.max_time * 1000,
+            }
+            for s in cls._subscribers.values()
+        ]
+        return sorted(rows, key=lambda row: row["avg_ms"], reverse=True)
@@ -0,0 +1,136 @@
+import math
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional
+
+# Bucket upper bounds in milliseconds: 0.05ms to ~2 minutes, about 10% apart,
+# so any percentile is within 10% of the true value
+BUCKET_BOUNDS = [0.05 * 1.1**i for i in range(155)]
+
+
+def format_ms(value: Optional[float]) -> str:
+    """Milliseconds for display; missing or infinite values show as a dash"""
+    if value is None or not math.isfinite(value):
+        return "—"
+    return f"{value:.0f}ms" if value >= 10 else f"{value:.1f}ms"
+
+
+class Histogram:
+    """Fixed log-scale buckets; cheap to update and to merge"""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        """Record one sample in milliseconds"""
+        self.counts[bisect_left(BUCKET_BOUNDS, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "Histogram"):
+        for i, n in enumerate(other.counts):
+            if n:
+                self.counts[i] += n
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th percentile (0-100)"""
+        if not self.count:
+            return None
+        rank = max(math.ceil(self.count * q / 100), 1)
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                bound = BUCKET_BOUNDS[i] if i < len(BUCKET_BOUNDS) else self.max
+                return min(bound, self.max)
+        return self.max
+
+    def cumulative(self, bounds: Iterable[float]) -> List[int]:
+        """Counts of samples at or below each bound (ms), Prometheus style
+
+        Samples are attributed by their bucket's upper bound, so counts are as
+        precise as the buckets.
+        """
+        result = []
+        seen = 0
+        index = 0
+        for bound in bounds:
+            while index < len(BUCKET_BOUNDS) and BUCKET_BOUNDS[index] <= bound:
+                seen += self.counts[index]
+                index += 1
+            result.append(seen)
+        return result
+
+    def __len__(self):
+        return self.count
+
+
+def rss_bytes() -> Optional[int]:
+    """Resident memory of this process, from /proc on Linux"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+class RollingHistogram:
+    """Histograms over the last hour, kept as one slot per minute
+
+    A sample lands in the slot for the current minute; slots are reused once
+    they are older than the ring, so memory is fixed no matter how many samples
+    are recorded. Window queries merge the slots they cover.
+    """
+
+    def __init__(self, slots: int = 60, slot_seconds: float = 60.0):
+        self.slot_seconds = slot_seconds
+        self._slots = [Histogram() for _ in range(slots)]
+        self._epochs = [-1] * slots
+
+    def _epoch(self, now: Optional[float]) -> int:
+        return int((time.monotonic() if now is None else now) // self.slot_seconds)
+
+    def observe(self, value: float, now: Optional[float] = None):
+        """Record one sample in milliseconds"""
+        epoch = self._epoch(now)
+        index = epoch % len(self._slots)
+        if self._epochs[index] != epoch:
+            self._slots[index] = Histogram()
+            self._epochs[index] = epoch
+        self._slots[index].observe(value)
+
+    def window(self, seconds: float, now: Optional[float] = None) -> Histogram:
+        """Merge the slots covering the last `seconds` (whole minutes)"""
+        epoch = self._epoch(now)
+        span = min(max(math.ceil(seconds / self.slot_seconds), 1), len(self._slots))
+        merged = Histogram()
+        for index, slot_epoch in enumerate(self._epochs):
+            if epoch - span < slot_epoch <= epoch:
+                merged.merge(self._slots[index])
+        return merged
+
+    def percentiles(
+        self,
+        seconds: float,
+        qs: Iterable[float] = (50, 95, 99),
+        now: Optional[float] = None,
+    ) -> Dict[float, Optional[float]]:
+        window = self.window(seconds, now)
+        return {q: window.percentile(q) for q in qs}
@@ -0,0 +1,187 @@
+from typing import Dict, List, Optional
+
+from .Database import Database
+from .Instrumentation import CommandStats
+from .Logger import Logger
+from .MessageDispatcher import MessageDispatcher
+from .Metrics import Histogram, rss_bytes
+from .Telemetry import Telemetry
+from .Watchdog import Watchdog
+
+# Prometheus histogram buckets, in milliseconds
+BUCKETS_MS = [1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _labels(labels: Optional[Dict[str, str]]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+class _Exposition:
+    """Builds Prometheus text format, one metric family at a time"""
+
+    def __init__(self):
+        self.lines: List[str] = []
+
+    def family(self, name: str, kind: str, help_text: str):
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+
+    def sample(self, name: str, value, labels: Optional[Dict[str, str]] = None):
+        if value is not None:
+            self.lines.append(f"{name}{_labels(labels)} {value}")
+
+    def histogram(
+        self, name: str, histogram: Histogram, labels: Optional[Dict[str, str]] = None
+    ):
+        """Emit a histogram recorded in ms as seconds"""
+        labels = labels or {}
+        for bound, count in zip(BUCKETS_MS, histogram.cumulative(BUCKETS_MS)):
+            self.sample(f"{name}_bucket", count, {**labels, "le": f"{bound / 1000:g}"})
+        self.sample(f"{name}_bucket", histogram.count, {**labels, "le": "+Inf"})
+        self.sample(f"{name}_sum", round(histogram.total / 1000, 6), labels)
+        self.sample(f"{name}_count", histogram.count, labels)
+
+    def text(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+class MetricsServer:
+    """Optional Prometheus endpoint on localhost
+
+    aiohttp.web is only imported when the server is started, and metrics are
+    read from the existing counters at scrape time, so a disabled endpoint
+    costs nothing.
+    """
+
+    _runner = None
+
+    @classmethod
+    async def start(cls, bot, host: str = "127.0.0.1", port: int = 9108):
+        if cls._runner is not None:
+            return
+        from aiohttp import web
+
+        async def handle(request):
+            return web.Response(
+                text=cls.render(bot), content_type="text/plain", charset="utf-8"
+            )
+
+        app = web.Application()
+        app.router.add_get("/metrics", handle)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        cls._runner = runner
+        print(f"\033[32mMetrics endpoint on http://{host}:{port}/metrics\033[0m")
+
+    @classmethod
+    async def stop(cls):
+        if cls._runner is not None:
+            await cls._runner.cleanup()
+            cls._runner = None
+
+    @staticmethod
+    def render(bot) -> str:
+        out = _Exposition()
+
+        # Commands
+        out.family(
+            "thembot_command_duration_seconds",
+            "histogram",
+            "Slash command wall time",
+        )
+        for name, stats in CommandStats.by_command.items():
+            out.histogram(
+                "thembot_command_duration_seconds", stats.wall, {"command": name}
+            )
+        out.family("thembot_command_errors_total", "counter", "Commands that raised")
+        for name, stats in CommandStats.by_command.items():
+            out.sample("thembot_command_errors_total", stats.errors, {"command": name})
+
+        # Sampled latencies
+        for key, name, help_text in (
+            ("db_query", "thembot_db_query_duration_seconds", "Database query time"),
+            (
+                "rest_request",
+                "thembot_rest_request_duration_seconds",
+                "Discord REST time",
+            ),
+            ("gateway", "thembot_gateway_latency_seconds", "Gateway heartbeat latency"),
+            ("loop_lag", "thembot_loop_lag_seconds", "Event loop scheduling lag"),
+        ):
+            if key in Telemetry.totals:
+                out.family(name, "histogram", help_text)
+                out.histogram(name, Telemetry.totals[key])
+
+        out.family("thembot_loop_stalls_total", "counter", "Event loop stalls seen")
+        out.sample("thembot_loop_stalls_total", Watchdog.stall_count)
+
+        # Database: the shared connection most queries use, and the pool if
+        # something has created it
+        conn = Database.conn
+        out.family("thembot_db_connection_up", "gauge", "Shared DB connection open")
+        out.sample(
+            "thembot_db_connection_up", int(conn is not None and not conn.is_closed())
+        )
+        if conn is not None:
+            out.family(
+                "thembot_db_queries_in_flight",
+                "gauge",
+                "Queries running on the shared connection",
+            )
+            out.sample("thembot_db_queries_in_flight", conn.in_flight)
+
+        pool = Database._pool
+        if pool is not None:
+            out.family("thembot_db_pool_connections", "gauge", "Pool connections")
+            out.sample(
+                "thembot_db_pool_connections", pool.get_size(), {"state": "open"}
+            )
+            out.sample(
+                "thembot_db_pool_connections", pool.get_idle_size(), {"state": "idle"}
+            )
+
+        # Queues
+        out.family("thembot_logger_in_flight", "gauge", "Log writes in progress")
+        out.sample("thembot_logger_in_flight", Logger.in_flight)
+
+        responder = bot.get_cog("MessageResponder")
+        if responder is not None:
+            out.family("thembot_responder_triggers_total", "counter", "THEM responses")
+            out.sample("thembot_responder_triggers_total", responder.triggered)
+            out.family("thembot_queue_depth", "gauge", "Items waiting in a queue")
+            out.sample(
+                "thembot_queue_depth", responder.outbound.qsize(), {"queue": "outbound"}
+            )
+            out.sample(
+                "thembot_queue_depth",
+                responder.dm_writer.pending(),
+                {"queue": "dm_log"},
+            )
+
+        # CTFtime cache
+        ctftime = bot.get_cog("CTFtimeAPI")
+        if ctftime is not None:
+            out.family("thembot_ctftime_cache_total", "counter", "CTFtime lookups")
+            out.sample(
+                "thembot_ctftime_cache_total", ctftime.cache_hits, {"result": "hit"}
+            )
+            out.sample(
+                "thembot_ctftime_cache_total", ctftime.cache_misses, {"result": "miss"}
+            )
+
+        # Process
+        out.family("thembot_messages_seen_total", "counter", "Messages dispatched")
+        out.sample("thembot_messages_seen_total", MessageDispatcher.messages_seen)
+        out.family("thembot_guilds", "gauge", "Guilds the bot is in")
+        out.sample("thembot_guilds", len(bot.guilds))
+        out.family("thembot_memory_rss_bytes", "gauge", "Resident memory")
+        out.sample("thembot_memory_rss_bytes", rss_bytes())
+
+        return out.text()
@@ -0,0 +1,310 @@
+import asyncio
+import inspect
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from functools import wraps
+from pathlib import Path
+from typing import List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+PROFILE_DIR = ROOT / "data" / "profiles"
+
+
+def _is_idle(code) -> bool:
+    """The loop is waiting for I/O in its selector"""
+    return code.co_name == "select" and code.co_filename.endswith("selectors.py")
+
+
+def _codes_of(func) -> set:
+    """Code object of the function innermost in a chain of wrappers
+
+    Wrappers such as @log's or @traced's share one code object between every
+    function they wrap, so matching on them would keep samples from other
+    commands too.
+    """
+    codes = set()
+    func = getattr(func, "__func__", func)
+    while func is not None:
+        code = getattr(func, "__code__", None)
+        if code is not None:
+            codes = {code}
+        func = getattr(func, "__wrapped__", None)
+    return codes
+
+
+def _label(code) -> str:
+    """Flamegraph frame name: qualified name plus a short file location"""
+    path = Path(code.co_filename)
+    if "site-packages" in path.parts:
+        where = "/".join(path.parts[path.parts.index("site-packages") + 1 :])
+    elif ROOT in path.parents:
+        where = str(path.relative_to(ROOT))
+    else:
+        where = path.name
+    return f"{code.co_qualname} ({where}:{code.co_firstlineno})".replace(";", ":")
+
+
+class ProfileSession:
+    """One profiler run and the stacks it collected"""
+
+    def __init__(
+        self,
+        target: Optional[str],
+        key: Optional[str],
+        codes: set,
+        invocations: Optional[int],
+        seconds: float,
+        interval: float,
+    ):
+        self.target = target
+        self.key = key  # name passed to Profiler.invoked() for this target
+        self.codes = codes
+        self.invocations = invocations
+        self.remaining = invocations
+        self.seconds = seconds
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.idle = 0
+        self.started = datetime.now(timezone.utc)
+        self.elapsed = 0.0
+        self.reason = "time limit"
+        self.path: Optional[Path] = None
+        self.done = threading.Event()
+
+    @property
+    def completed(self) -> int:
+        return (self.invocations or 0) - (self.remaining or 0)
+
+    def add(self, frame):
+        """Count one stack sample; runs on the profiler thread"""
+        self.samples += 1
+        codes = []
+        while frame is not None:
+            codes.append(frame.f_code)
+            frame = frame.f_back
+        if not codes:
+            return
+        if self.codes:
+            # Only time spent running the target's own code counts
+            if self.codes.isdisjoint(codes):
+                return
+        elif _is_idle(codes[0]):
+            self.idle += 1
+            return
+        self.stacks[tuple(reversed(codes))] += 1
+
+    def folded(self) -> List[str]:
+        """Collapsed stacks, one `frame;frame;frame count` line each"""
+        lines = [
+            (";".join(_label(code) for code in stack), count)
+            for stack, count in self.stacks.items()
+        ]
+        lines.sort(key=lambda line: line[1], reverse=True)
+        return [f"{stack} {count}" for stack, count in lines]
+
+    def top(self, limit: int = 10) -> List[tuple]:
+        """Functions with the most samples of their own (leaf frames)"""
+        own: Counter = Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+        return [(_label(code), count) for code, count in own.most_common(limit)]
+
+
+class Profiler:
+    """Statistical profiler for the live bot, started on demand by an admin
+
+    A thread samples the event loop thread's stack every `interval` with
+    `sys._current_frames()` and counts identical stacks, so the bot keeps
+    running at full speed and nothing has to be restarted under cProfile.
+    Coroutines waiting on an `await` aren't on the stack, so the profile shows
+    where the loop spends CPU time; waits on the DB or Discord show up in
+    tracing instead.
+
+    A run lasts a number of seconds, or until a target slash command, message
+    handler or function (e.g. `CTFModalPart2.callback`) has finished a number
+    of times. With a target only samples taken inside its code are kept. The
+    result is written to data/profiles/ in the collapsed stack format read by
+    flamegraph.pl, speedscope and inferno.
+    """
+
+    session: Optional[ProfileSession] = None
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+    _loop_thread_id: Optional[int] = None
+    _restore = None
+
+    @classmethod
+    async def run(
+        cls,
+        bot,
+        seconds: float = 30,
+        target: Optional[str] = None,
+        invocations: int = 5,
+        interval_ms: float = 5,
+    ) -> ProfileSession:
+        """Profile until done and write the collapsed stacks; raises ValueError"""
+        if cls.session is not None:
+            raise ValueError("A profile is already running")
+
+        key, codes, patch = cls._resolve(bot, target) if target else (None, set(), None)
+        session = ProfileSession(
+            target,
+            key,
+            codes,
+            invocations if target else None,
+            seconds,
+            interval_ms / 1000,
+        )
+        cls._loop = asyncio.get_running_loop()
+        cls._loop_thread_id = threading.get_ident()
+        cls._restore = patch
+        cls.session = session
+
+        thread = threading.Thread(
+            target=cls._sample, args=(session,), name="profiler", daemon=True
+        )
+        start = time.perf_counter()
+        try:
+            thread.start()
+            await asyncio.to_thread(thread.join)
+        finally:
+            session.done.set()
+            session.elapsed = time.perf_counter() - start
+            if cls._restore:
+                cls._restore()
+                cls._restore = None
+            cls.session = None
+
+        session.path = await asyncio.to_thread(cls._write, session)
+        return session
+
+    @classmethod
+    def invoked(cls, name: str):
+        """Called when a command or message handler finishes
+
+        Every application command is counted by CommandStats' after-invoke
+        hook, message handlers by the MessageDispatcher.
+        """
+        session = cls.session
+        if session is None or session.key != name or not session.remaining:
+            return
+        session.remaining -= 1
+        if not session.remaining:
+            session.reason = f"{session.invocations} invocations"
+            session.done.set()
+
+    @classmethod
+    def targets(cls, bot) -> List[str]:
+        """Slash command and message handler names that can be profiled"""
+        from .MessageDispatcher import MessageDispatcher
+
+        names = [cmd.qualified_name for cmd in bot.application_commands]
+        return sorted(names + list(MessageDispatcher._subscribers))
+
+    # --- Target resolution ---
+
+    @classmethod
+    def _resolve(cls, bot, target: str):
+        """Find what `target` names: (invoked() key, code objects, undo patch)"""
+        from .MessageDispatcher import MessageDispatcher
+
+        name = target.strip().lstrip("/")
+        commands = {cmd.qualified_name: cmd for cmd in bot.application_commands}
+
+        if name in commands:
+            return name, _codes_of(commands[name].callback), None
+        subscriber = MessageDispatcher._subscribers.get(name)
+        if subscriber is not None:
+            return name, _codes_of(subscriber.callback), None
+
+        owner, attr, raw = cls._find_function(name)
+        func = getattr(raw, "__func__", raw)
+        codes = _codes_of(func)
+
+        # A function behind a command or handler is counted by their hooks
+        for qualified, cmd in commands.items():
+            if not codes.isdisjoint(_codes_of(cmd.callback)):
+                return qualified, codes, None
+        for subscriber in MessageDispatcher._subscribers.values():
+            if getattr(subscriber.callback, "__func__", None) is func:
+                return subscriber.name, codes, None
+
+        # Anything else is wrapped for the duration of the run to count calls
+        key = func.__qualname__
+        if inspect.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def counted(*args, **kwargs):
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    cls.invoked(key)
+
+        else:
+
+            @wraps(func)
+            def counted(*args, **kwargs):
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    cls.invoked(key)
+
+        wrapper = type(raw)(counted) if raw is not func else counted
+        setattr(owner, attr, wrapper)
+        return key, codes, lambda: setattr(owner, attr, raw)
+
+    @staticmethod
+    def _find_function(name: str):
+        """Look up `Class.method`, `function` or `method` in the bot's modules"""
+        parts = name.split(".")
+        found = {}
+        for module_name, module in list(sys.modules.items()):
+            if not module_name.startswith(("Cogs.", "Modules.")) or module is None:
+                continue
+            for obj in list(vars(module).values()):
+                if getattr(obj, "__module__", None) != module_name:
+                    continue
+                if inspect.isclass(obj):
+                    if len(parts) == 1 or parts[0] == obj.__name__:
+                        owner, attr = obj, parts[-1]
+                    else:
+                        continue
+                elif len(parts) == 1 and getattr(obj, "__name__", None) == name:
+                    owner, attr = module, name
+                else:
+                    continue
+                raw = vars(owner).get(attr)
+                func = getattr(raw, "__func__", raw)
+                if inspect.isfunction(func):
+                    found[func] = (owner, attr, raw)
+
+        if not found:
+            raise ValueError(f"No command, message handler or function named `{name}`")
+        if len(found) > 1:
+            options = ", ".join(sorted(f.__qualname__ for f in found))
+            raise ValueError(f"`{name}` is ambiguous: {options}")
+        return next(iter(found.values()))
+
+    # --- Profiler thread ---
+
+    @classmethod
+    def _sample(cls, session: ProfileSession):
+        deadline = time.monotonic() + session.seconds
+        while not session.done.wait(session.interval):
+            if time.monotonic() >= deadline or cls._loop.is_closed():
+                break
+            session.add(sys._current_frames().get(cls._loop_thread_id))
+
+    @staticmethod
+    def _write(session: ProfileSession) -> Path:
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        stamp = session.started.strftime("%Y%m%d-%H%M%S")
+        slug = "".join(
+            c if c.isalnum() else "_" for c in (session.target or "all")
+        ).strip("_")
+        path = PROFILE_DIR / f"{stamp}-{slug}.folded"
+        path.write_text("".join(line + "\n" for line in session.folded()))
+        return path
@@ -0,0 +1,200 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, Optional
+
+import disnake
+
+from .ActionQueue import RouteLimiter
+
+
+class PurgeJob:
+    """Deletes a channel's history in chunks while it streams it.
+
+    History is read 100 messages at a time. Matching messages younger than 14
+    days are removed with one bulk delete per chunk; older ones can't be bulk
+    deleted and go to a few workers that delete them one by one under a
+    per-channel rate limit. Scanning doesn't wait for those workers beyond a
+    bounded backlog, so a channel of mixed ages is worked on from both ends.
+    """
+
+    BULK_LIMIT = 100
+    # Discord rejects bulk deletes of messages older than 14 days; keep a margin
+    BULK_MAX_AGE = timedelta(days=14) - timedelta(minutes=5)
+    OLD_DELETE_WORKERS = 3
+    OLD_DELETE_LIMIT = (5, 5.0, 3)
+
+    # channel id -> running job, so a channel is only purged once at a time
+    active: Dict[int, "PurgeJob"] = {}
+
+    def __init__(
+        self,
+        channel: disnake.abc.Messageable,
+        limit: Optional[int] = None,
+        *,
+        before=None,
+        after=None,
+        check: Optional[Callable[[disnake.Message], bool]] = None,
+    ):
+        self.channel = channel
+        self.limit = limit
+        self.before = before
+        self.after = after
+        self.check = check
+        self.limiter = RouteLimiter(*self.OLD_DELETE_LIMIT)
+        self.scanned = 0
+        self.deleted = 0
+        self.failed = 0
+        self.cancelled = False
+        self.done = False
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+
+    # --- Metrics ---
+
+    @property
+    def elapsed(self) -> float:
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def rate(self) -> float:
+        """Deleted messages per second"""
+        return self.deleted / self.elapsed if self.elapsed else 0.0
+
+    def progress_text(self) -> str:
+        return (
+            f"🧹 Purging... deleted **{self.deleted}** "
+            f"(scanned {self.scanned}, {self.rate:.1f} msg/s)"
+        )
+
+    def summary(self) -> str:
+        status = "⏹️ Purge cancelled" if self.cancelled else "✅ Purge finished"
+        text = (
+            f"{status}: deleted **{self.deleted}** message(s) "
+            f"in {self.elapsed:.1f}s ({self.rate:.1f} msg/s)"
+        )
+        if self.failed:
+            text += f", {self.failed} failed"
+        return text
+
+    def cancel(self):
+        """Stop scanning and drop deletes that haven't started yet"""
+        self.cancelled = True
+
+    def claim(self) -> bool:
+        """Reserve the channel for this job; False if another purge has it
+
+        Synchronous, so checking and reserving can't be split by an await.
+        """
+        return self.active.setdefault(self.channel.id, self) is self
+
+    def release(self):
+        if self.active.get(self.channel.id) is self:
+            del self.active[self.channel.id]
+
+    # --- Running ---
+
+    async def run(
+        self,
+        progress: Optional[Callable[["PurgeJob"], Awaitable[None]]] = None,
+        interval: float = 2.0,
+    ) -> "PurgeJob":
+        """Run the purge, awaiting `progress(job)` every `interval` seconds
+
+        Raises:
+            RuntimeError: The channel is already being purged
+            disnake.Forbidden: Missing permissions to read or delete
+        """
+        if not self.claim():
+            raise RuntimeError("A purge is already running in this channel")
+        self.started = time.perf_counter()
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.BULK_LIMIT)
+        workers = [
+            asyncio.create_task(self._delete_old(queue))
+            for _ in range(self.OLD_DELETE_WORKERS)
+        ]
+        reporter = asyncio.create_task(self._report(progress, interval))
+        try:
+            chunk = []
+            async for message in self.channel.history(
+                limit=self.limit,
+                before=self.before,
+                after=self.after,
+                oldest_first=False,
+            ):
+                if self.cancelled:
+                    break
+                self.scanned += 1
+                if self.check is None or self.check(message):
+                    chunk.append(message)
+                if len(chunk) == self.BULK_LIMIT:
+                    await self._flush(chunk, queue)
+                    chunk = []
+
+            if chunk and not self.cancelled:
+                await self._flush(chunk, queue)
+            await queue.join()
+        finally:
+            for task in (*workers, reporter):
+                task.cancel()
+            self.finished = time.perf_counter()
+            self.done = True
+            self.release()
+            print(
+                f"Purge in #{getattr(self.channel, 'name', self.channel.id)}: "
+                f"{self.deleted} deleted, {self.failed} failed, "
+                f"{self.scanned} scanned in {self.elapsed:.1f}s ({self.rate:.1f} msg/s)"
+            )
+        return self
+
+    async def _flush(self, chunk: list, queue: asyncio.Queue):
+        """Bulk delete the recent part of a chunk and queue the rest"""
+        cutoff = datetime.now(timezone.utc) - self.BULK_MAX_AGE
+        recent = [m for m in chunk if m.created_at > cutoff]
+        old = [m for m in chunk if m.created_at <= cutoff]
+
+        # Bulk delete needs at least two messages
+        if len(recent) >= 2:
+            try:
+                await self.channel.delete_messages(recent)
+                self.deleted += len(recent)
+            except disnake.Forbidden:
+                raise
+            except disnake.HTTPException as e:
+                print(f"\033[31mBulk delete failed: {e}\033[0m")
+                self.failed += len(recent)
+        else:
+            old = recent + old
+
+        for message in old:
+            if self.cancelled:
+                return
+            await queue.put(message)
+
+    async def _delete_old(self, queue: asyncio.Queue):
+        while True:
+            message = await queue.get()
+            try:
+                if not self.cancelled:
+                    await self.limiter.acquire(self.channel.id)
+                    await message.delete()
+                    self.deleted += 1
+            except disnake.NotFound:
+                pass
+            except disnake.HTTPException:
+                self.failed += 1
+            finally:
+                queue.task_done()
+
+    async def _report(self, progress, interval: float):
+        if progress is None:
+            return
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await progress(self)
+            except Exception as e:
+                print(f"Purge progress update failed: {e}")
@@ -0,0 +1,106 @@
+from collections import Counter, OrderedDict, deque
+from typing import Optional
+
+import disnake
+
+
+class ReplyTracker:
+    """Answers "is this a reply to the bot?" without a REST call when possible.
+
+    Recent bot-authored message ids are kept per channel in bounded buffers, and
+    the least recently active channels are dropped once `max_channels` is hit.
+    Lookups fall through resolved reference -> tracked ids -> client message
+    cache -> fetch_message, and every source is counted so hit rates can be
+    reported.
+    """
+
+    SOURCES = ("resolved", "tracked", "cache", "fetch", "failed")
+
+    def __init__(self, bot, per_channel: int = 200, max_channels: int = 500):
+        self.bot = bot
+        self.per_channel = per_channel
+        self.max_channels = max_channels
+        self._channels: OrderedDict[int, tuple[deque, set]] = OrderedDict()
+        self.lookups = Counter()
+
+    def remember(self, message: disnake.Message):
+        """Record a message the bot sent"""
+        channel_id = message.channel.id
+        entry = self._channels.get(channel_id)
+        if entry is None:
+            entry = (deque(), set())
+            self._channels[channel_id] = entry
+            if len(self._channels) > self.max_channels:
+                self._channels.popitem(last=False)
+        else:
+            self._channels.move_to_end(channel_id)
+
+        order, ids = entry
+        order.append(message.id)
+        ids.add(message.id)
+        if len(order) > self.per_channel:
+            ids.discard(order.popleft())
+
+    def _is_tracked(self, channel_id: int, message_id: int) -> bool:
+        entry = self._channels.get(channel_id)
+        return entry is not None and message_id in entry[1]
+
+    async def is_reply_to_bot(self, message: disnake.Message) -> bool:
+        """Check whether the message replies to one of the bot's messages"""
+        reference = message.reference
+        if reference is None or reference.message_id is None:
+            return False
+
+        bot_id = self.bot.user.id
+
+        # The gateway usually ships the referenced message with the reply
+        resolved = reference.resolved
+        if isinstance(resolved, disnake.Message):
+            self.lookups["resolved"] += 1
+            return resolved.author.id == bot_id
+        if isinstance(resolved, disnake.DeletedReferencedMessage):
+            self.lookups["resolved"] += 1
+            return False
+
+        channel_id = reference.channel_id or message.channel.id
+        if self._is_tracked(channel_id, reference.message_id):
+            self.lookups["tracked"] += 1
+            return True
+
+        cached = self.bot.get_message(reference.message_id)
+        if cached is not None:
+            self.lookups["cache"] += 1
+            return cached.author.id == bot_id
+
+        # Rare fallback: ask Discord
+        try:
+            replied_msg = await message.channel.fetch_message(reference.message_id)
+        except (disnake.NotFound, disnake.Forbidden):
+            self.lookups["failed"] += 1
+            return False
+        self.lookups["fetch"] += 1
+        return replied_msg.author.id == bot_id
+
+    def hit_rate(self) -> Optional[float]:
+        """Share of lookups answered without a REST call, or None if none yet"""
+        total = sum(self.lookups.values())
+        if not total:
+            return None
+        return 1 - (self.lookups["fetch"] + self.lookups["failed"]) / total
+
+    def summary(self) -> str:
+        """Human readable lookup stats"""
+        total = sum(self.lookups.values())
+        if not total:
+            return "No reply lookups yet"
+
+        lines = [
+            f"{source}: {self.lookups[source]} ({self.lookups[source] / total:.0%})"
+            for source in self.SOURCES
+        ]
+        lines.append(f"hit rate: {self.hit_rate():.1%} of {total} lookups")
+        lines.append(
+            f"tracking {sum(len(o) for o, _ in self._channels.values())} messages "
+            f"in {len(self._channels)} channels"
+        )
+        return "\n".join(lines)
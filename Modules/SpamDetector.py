@@ -0,0 +1,172 @@
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Hashable, List, Optional
+
+import disnake
+
+
+class SlidingWindow:
+    """Fires when `limit` events for one key land within `seconds`
+
+    Each key keeps a ring buffer of its last `limit` events, so a check is a
+    single append plus a look at the oldest entry. Keys live in an LRU ordered by
+    last activity: keys idle for longer than the window are evicted from the
+    front as new events arrive, and at most `max_keys` keys are kept.
+    """
+
+    def __init__(self, limit: int, seconds: float, max_keys: int = 10000):
+        self.limit = max(int(limit), 1)
+        self.seconds = float(seconds)
+        self.max_keys = max_keys
+        self._keys: OrderedDict = OrderedDict()
+
+    def hit(self, key: Hashable, item, now: float) -> Optional[list]:
+        """Record an event; returns the window's items if it just filled up"""
+        self._evict(now)
+
+        entry = self._keys.get(key)
+        if entry is None:
+            entry = self._keys[key] = [now, deque(maxlen=self.limit)]
+        else:
+            entry[0] = now
+            self._keys.move_to_end(key)
+
+        window = entry[1]
+        window.append((now, item))
+        if len(window) == self.limit and now - window[0][0] <= self.seconds:
+            # Start over so the same burst isn't reported on every message
+            del self._keys[key]
+            return [item for _, item in window]
+        return None
+
+    def _evict(self, now: float):
+        keys = self._keys
+        while keys:
+            last_seen = next(iter(keys.values()))[0]
+            if now - last_seen <= self.seconds and len(keys) < self.max_keys:
+                break
+            keys.popitem(last=False)
+
+    def __len__(self):
+        return len(self._keys)
+
+
+@dataclass
+class Verdict:
+    """What tripped, who is involved and the messages to clean up"""
+
+    reason: str
+    guild_id: int
+    user_ids: set = field(default_factory=set)
+    messages: List[disnake.Message] = field(default_factory=list)
+    channel_id: Optional[int] = None
+
+
+class SpamDetector:
+    """Spam and raid detection over sliding windows
+
+    Per message it checks four windows: one user's message rate, one channel's
+    message rate, one user repeating the same content, and several users posting
+    the same content. Joins feed a per-guild join-rate window. Every check is a
+    constant number of dict and deque operations.
+    """
+
+    DEFAULTS = {
+        "user_messages": {"limit": 6, "seconds": 5},
+        "channel_messages": {"limit": 25, "seconds": 5},
+        "duplicates": {"limit": 3, "seconds": 30},
+        "shared_duplicates": {"limit": 4, "seconds": 60},
+        "joins": {"limit": 8, "seconds": 30},
+    }
+
+    def __init__(self, windows: Optional[dict] = None, max_keys: int = 10000):
+        windows = {**self.DEFAULTS, **(windows or {})}
+        self.user_messages = self._window(windows["user_messages"], max_keys)
+        self.channel_messages = self._window(windows["channel_messages"], max_keys)
+        self.duplicates = self._window(windows["duplicates"], max_keys)
+        self.shared_duplicates = self._window(windows["shared_duplicates"], max_keys)
+        self.joins = self._window(windows["joins"], max_keys)
+
+    @staticmethod
+    def _window(config: dict, max_keys: int) -> SlidingWindow:
+        return SlidingWindow(config["limit"], config["seconds"], max_keys)
+
+    @classmethod
+    def from_config(cls, config: Optional[dict]) -> "SpamDetector":
+        """Build from the `antispam` config section"""
+        config = config or {}
+        windows = {name: config[name] for name in cls.DEFAULTS if name in config}
+        return cls(windows, max_keys=config.get("max_tracked", 10000))
+
+    @staticmethod
+    def fingerprint(message: disnake.Message) -> Optional[int]:
+        """Hash of the normalised content, or None if there's nothing to compare"""
+        content = " ".join(message.content.casefold().split())
+        attachments = tuple(a.filename for a in message.attachments)
+        if not content and not attachments:
+            return None
+        return hash((content, attachments))
+
+    def check_message(
+        self, message: disnake.Message, now: Optional[float] = None
+    ) -> Optional[Verdict]:
+        """Feed a guild message through the windows; returns the first trip"""
+        now = time.monotonic() if now is None else now
+        guild_id = message.guild.id
+        user_key = (guild_id, message.author.id)
+
+        tripped = self.user_messages.hit(user_key, message, now)
+        if tripped:
+            return self._verdict("message flood", guild_id, tripped)
+
+        fingerprint = self.fingerprint(message)
+        if fingerprint is not None:
+            tripped = self.duplicates.hit((*user_key, fingerprint), message, now)
+            if tripped:
+                return self._verdict("repeated message", guild_id, tripped)
+
+            tripped = self.shared_duplicates.hit((guild_id, fingerprint), message, now)
+            # The same user repeating itself is handled above
+            if tripped and len({m.author.id for m in tripped}) > 1:
+                return self._verdict("same message from many users", guild_id, tripped)
+
+        tripped = self.channel_messages.hit(message.channel.id, message, now)
+        if tripped:
+            return Verdict(
+                "channel flood",
+                guild_id,
+                {m.author.id for m in tripped},
+                channel_id=message.channel.id,
+            )
+        return None
+
+    def check_join(
+        self, member: disnake.Member, now: Optional[float] = None
+    ) -> Optional[Verdict]:
+        """Feed a member join; trips when too many members join at once"""
+        now = time.monotonic() if now is None else now
+        tripped = self.joins.hit(member.guild.id, member.id, now)
+        if tripped:
+            return Verdict("join raid", member.guild.id, set(tripped))
+        return None
+
+    @staticmethod
+    def _verdict(reason: str, guild_id: int, messages: list) -> Verdict:
+        return Verdict(
+            reason,
+            guild_id,
+            {m.author.id for m in messages},
+            messages,
+            messages[-1].channel.id,
+        )
+
+    def tracked(self) -> dict:
+        """Number of live keys per window"""
+        return {
+            "user_messages": len(self.user_messages),
+            "channel_messages": len(self.channel_messages),
+            "duplicates": len(self.duplicates),
+            "shared_duplicates": len(self.shared_duplicates),
+            "joins": len(self.joins),
+        }
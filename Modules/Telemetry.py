@@ -0,0 +1,99 @@
+import asyncio
+import math
+import time
+from typing import Dict, List, Optional
+
+from .Metrics import Histogram, RollingHistogram
+
+
+class Telemetry:
+    """Background sampling of gateway, REST and event loop latency
+
+    Three small tasks feed rolling histograms so /ping can report percentiles
+    straight from memory:
+    - gateway: the websocket heartbeat latency (`bot.latency`)
+    - rest: the round trip of a cheap `GET /gateway` request
+    - loop_lag: how late an `asyncio.sleep` wakes up, i.e. event loop blocking
+    """
+
+    LOOP_INTERVAL = 0.5
+    GATEWAY_INTERVAL = 15.0
+    REST_INTERVAL = 30.0
+
+    histograms: Dict[str, RollingHistogram] = {
+        "gateway": RollingHistogram(),
+        "rest": RollingHistogram(),
+        "loop_lag": RollingHistogram(),
+    }
+    # All-time histograms of the same samples, for cumulative exporters
+    totals: Dict[str, Histogram] = {}
+    _bot = None
+    _tasks: List[asyncio.Task] = []
+    started_at: Optional[float] = None
+
+    @classmethod
+    def start(cls, bot):
+        """Start the samplers once"""
+        if cls._tasks:
+            return
+        cls._bot = bot
+        cls.started_at = time.monotonic()
+        cls._tasks = [
+            asyncio.create_task(cls._sample_loop_lag(), name="telemetry-loop"),
+            asyncio.create_task(cls._sample_gateway(), name="telemetry-gateway"),
+            asyncio.create_task(cls._sample_rest(), name="telemetry-rest"),
+        ]
+
+    @classmethod
+    def stop(cls):
+        for task in cls._tasks:
+            task.cancel()
+        cls._tasks = []
+
+    @classmethod
+    def observe(cls, name: str, value: float):
+        """Record a sample (ms) in a named histogram, creating it on first use"""
+        histogram = cls.histograms.get(name)
+        if histogram is None:
+            histogram = cls.histograms[name] = RollingHistogram()
+        histogram.observe(value)
+
+        total = cls.totals.get(name)
+        if total is None:
+            total = cls.totals[name] = Histogram()
+        total.observe(value)
+
+    @classmethod
+    def percentiles(cls, name: str, seconds: float) -> dict:
+        return cls.histograms[name].percentiles(seconds)
+
+    # --- Samplers ---
+
+    @classmethod
+    async def _sample_loop_lag(cls):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(cls.LOOP_INTERVAL)
+            lag = time.perf_counter() - start - cls.LOOP_INTERVAL
+            cls.observe("loop_lag", max(lag, 0.0) * 1000)
+
+    @classmethod
+    async def _sample_gateway(cls):
+        await cls._bot.wait_until_ready()
+        while True:
+            latency = cls._bot.latency
+            if math.isfinite(latency):
+                cls.observe("gateway", latency * 1000)
+            await asyncio.sleep(cls.GATEWAY_INTERVAL)
+
+    @classmethod
+    async def _sample_rest(cls):
+        await cls._bot.wait_until_ready()
+        while True:
+            start = time.perf_counter()
+            try:
+                await cls._bot.http.get_gateway()
+                cls.observe("rest", (time.perf_counter() - start) * 1000)
+            except Exception as e:
+                print(f"REST latency probe failed: {e}")
+            await asyncio.sleep(cls.REST_INTERVAL)
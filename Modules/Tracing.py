@@ -0,0 +1,206 @@
+import asyncio
+import json
+import os
+import random
+import time
+from contextvars import ContextVar
+from functools import wraps
+from pathlib import Path
+from typing import Optional
+
+from .BatchWriter import BatchWriter
+
+# The span the current task is inside of. Tasks spawned from a span inherit it,
+# so their work shows up in the same trace.
+_current: ContextVar = ContextVar("trace_span", default=None)
+# Marker for "inside a trace that was not sampled", so children skip cheaply
+_UNSAMPLED = object()
+
+
+class _NoopSpan:
+    """Returned when tracing is off or the trace was not sampled"""
+
+    recording = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, key, value):
+        pass
+
+
+class _SuppressedSpan(_NoopSpan):
+    """Root of an unsampled trace: marks the context so children are skipped"""
+
+    def __enter__(self):
+        self._token = _current.set(_UNSAMPLED)
+        return self
+
+    def __exit__(self, *exc):
+        _current.reset(self._token)
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class Span:
+    __slots__ = (
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "name",
+        "attributes",
+        "start",
+        "_started",
+        "_token",
+    )
+    recording = True
+
+    def __init__(self, name: str, parent: Optional["Span"], attributes: dict):
+        self.name = name
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.trace_id = parent.trace_id if parent else f"{random.getrandbits(128):032x}"
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = attributes
+
+    def set(self, key: str, value):
+        self.attributes[key] = value
+
+    def __enter__(self):
+        self.start = time.time()
+        self._started = time.perf_counter()
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = (time.perf_counter() - self._started) * 1000
+        _current.reset(self._token)
+        Tracer.export(
+            {
+                "trace_id": self.trace_id,
+                "span_id": self.span_id,
+                "parent_id": self.parent_id,
+                "name": self.name,
+                "start": round(self.start, 6),
+                "duration_ms": round(duration, 3),
+                "status": "error" if exc_type else "ok",
+                "error": f"{exc_type.__name__}: {exc}" if exc_type else None,
+                "attributes": self.attributes,
+            }
+        )
+        return False
+
+
+class Tracer:
+    """Sampled tracing spans written to a local JSONL file
+
+    Whether a trace is recorded is decided once at its root span, so a sampled
+    command keeps all of its children (log insert, queries, REST calls) and an
+    unsampled one costs a context variable lookup per span. Finished spans are
+    buffered and appended to `path` in a thread by a BatchWriter, one JSON
+    object per line; the file is rotated to `<path>.1` at `max_bytes`.
+    """
+
+    enabled = False
+    sample_rate = 0.1
+    path: Path = Path(__file__).parent.parent / "data" / "traces.jsonl"
+    max_bytes = 50 * 1024 * 1024
+    _writer: Optional[BatchWriter] = None
+
+    @classmethod
+    def start(
+        cls,
+        sample_rate: float = 0.1,
+        path: Optional[str] = None,
+        max_file_mb: float = 50,
+    ):
+        """Enable tracing; call from the event loop"""
+        if cls.enabled:
+            return
+        cls.sample_rate = sample_rate
+        if path:
+            cls.path = Path(path)
+        cls.max_bytes = int(max_file_mb * 1024 * 1024)
+        cls.path.parent.mkdir(parents=True, exist_ok=True)
+        cls._writer = BatchWriter(
+            cls._write, max_batch=500, max_delay=5.0, name="TraceWriter"
+        )
+        cls._writer.start()
+        cls.enabled = True
+
+    @classmethod
+    async def stop(cls):
+        cls.enabled = False
+        if cls._writer:
+            await cls._writer.close()
+
+    @classmethod
+    def span(cls, name: str, **attributes):
+        """Context manager for one span, a child of the current one if any"""
+        if not cls.enabled:
+            return _NOOP
+        parent = _current.get()
+        if parent is _UNSAMPLED:
+            return _NOOP
+        if parent is None and random.random() >= cls.sample_rate:
+            return _SuppressedSpan()
+        return Span(name, parent, attributes)
+
+    @classmethod
+    def annotate(cls, key: str, value):
+        """Set an attribute on the current span, if it is being recorded"""
+        span = _current.get()
+        if isinstance(span, Span):
+            span.set(key, value)
+
+    @classmethod
+    def export(cls, span: dict):
+        if cls._writer:
+            cls._writer.add(span)
+
+    @classmethod
+    async def _write(cls, spans: list) -> bool:
+        lines = "".join(json.dumps(span, default=str) + "\n" for span in spans)
+        await asyncio.to_thread(cls._append, lines)
+        return True
+
+    @classmethod
+    def _append(cls, lines: str):
+        try:
+            if cls.path.stat().st_size >= cls.max_bytes:
+                os.replace(cls.path, cls.path.with_name(cls.path.name + ".1"))
+        except FileNotFoundError:
+            pass
+        with open(cls.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+    @classmethod
+    def instrument(cls, target: type, prefix: Optional[str] = None):
+        """Trace every async classmethod and staticmethod defined on a class"""
+        prefix = prefix or target.__name__
+        for name, attr in list(vars(target).items()):
+            if not isinstance(attr, (classmethod, staticmethod)):
+                continue
+            func = attr.__func__
+            if asyncio.iscoroutinefunction(func):
+                setattr(target, name, type(attr)(traced(f"{prefix}.{name}")(func)))
+
+
+def traced(name: Optional[str] = None):
+    """Decorator running a coroutine function inside a span"""
+
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            with Tracer.span(span_name):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
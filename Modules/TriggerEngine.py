@@ -0,0 +1,73 @@
+import re
+from typing import Iterable, Optional
+
+import disnake
+
+
+class TriggerEngine:
+    """Matches messages against keyword, emoji and URL rules from config.
+
+    All rules are compiled into a single case-insensitive regex so a message is
+    scanned once no matter how many rules are configured.
+    """
+
+    def __init__(
+        self,
+        keywords: Iterable[str] = (),
+        emojis: Iterable[str] = (),
+        urls: Iterable[str] = (),
+    ):
+        self.keywords = [str(k) for k in keywords if k]
+        self.emojis = [str(e) for e in emojis if e]
+        self.urls = [str(u) for u in urls if u]
+
+        self._content_re = self._compile(self.keywords + self.emojis + self.urls)
+        self._url_re = self._compile(self.urls)
+
+    @classmethod
+    def from_config(
+        cls, config: dict, default: Optional[dict] = None
+    ) -> "TriggerEngine":
+        """Build an engine from the `responder.triggers` section of config.yml
+
+        Args:
+            config: The full config dictionary
+            default: Rules to use for any kind missing from the config
+        """
+        default = default or {}
+        triggers = (config.get("responder") or {}).get("triggers") or {}
+        return cls(
+            keywords=triggers.get("keywords", default.get("keywords", [])),
+            emojis=triggers.get("emojis", default.get("emojis", [])),
+            urls=triggers.get("urls", default.get("urls", [])),
+        )
+
+    @staticmethod
+    def _compile(rules: list) -> Optional[re.Pattern]:
+        """Compile rules into one alternation, longest rule first"""
+        unique = sorted(set(rules), key=len, reverse=True)
+        if not unique:
+            return None
+        return re.compile("|".join(re.escape(rule) for rule in unique), re.IGNORECASE)
+
+    def match(self, message: disnake.Message) -> Optional[str]:
+        """Return the rule text that matched the message, or None"""
+        if self._content_re and message.content:
+            found = self._content_re.search(message.content)
+            if found:
+                return found.group(0)
+
+        # Embeds and attachments only need to be looked at for URL rules
+        if not self._url_re:
+            return None
+
+        for embed in message.embeds:
+            url = embed.image.url if embed.image else None
+            if isinstance(url, str) and self._url_re.fullmatch(url):
+                return url
+
+        for attachment in message.attachments:
+            if self._url_re.fullmatch(attachment.url):
+                return attachment.url
+
+        return None
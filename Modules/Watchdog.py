@@ -0,0 +1,190 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from .MessageDispatcher import MessageDispatcher
+from .Telemetry import Telemetry
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+class _SlowCallbackHandler(logging.Handler):
+    """Collects asyncio's debug-mode "Executing <Handle> took N seconds" warnings"""
+
+    def emit(self, record: logging.LogRecord):
+        message = record.getMessage()
+        if message.startswith("Executing"):
+            Watchdog.record(
+                {
+                    "kind": "slow_callback",
+                    "when": datetime.now(timezone.utc),
+                    "duration_ms": None,
+                    "command": None,
+                    "location": None,
+                    "stack": [message],
+                }
+            )
+
+
+class Watchdog:
+    """Detects event loop stalls from a separate thread and names the culprit.
+
+    Every `interval` the watchdog thread schedules a no-op on the loop. If it
+    hasn't run within `threshold`, the loop is blocked, so the thread grabs the
+    loop thread's current stack with `sys._current_frames()`. The stack is
+    mapped to the cog file and the slash command or message handler it belongs
+    to, and recorded once the loop catches up.
+    """
+
+    threshold = 0.25
+    interval = 0.5
+    stalls: deque = deque(maxlen=50)
+    stall_count = 0
+
+    _bot = None
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+    _loop_thread_id: Optional[int] = None
+    _thread: Optional[threading.Thread] = None
+    _stop = threading.Event()
+    _codes: dict = {}
+    _codes_key = None
+
+    @classmethod
+    def start(
+        cls,
+        bot,
+        threshold_ms: float = 250,
+        interval_ms: float = 500,
+        asyncio_debug: bool = False,
+    ):
+        """Start the watchdog thread; call from the event loop"""
+        if cls._thread and cls._thread.is_alive():
+            return
+        cls._bot = bot
+        cls._loop = asyncio.get_running_loop()
+        cls._loop_thread_id = threading.get_ident()
+        cls.threshold = threshold_ms / 1000
+        cls.interval = interval_ms / 1000
+        cls._refresh_codes()
+
+        if asyncio_debug:
+            # Debug mode adds overhead but names every slow callback with the
+            # stack of where it was created
+            cls._loop.set_debug(True)
+            cls._loop.slow_callback_duration = cls.threshold
+            logging.getLogger("asyncio").addHandler(_SlowCallbackHandler())
+
+        cls._stop.clear()
+        cls._thread = threading.Thread(target=cls._run, name="watchdog", daemon=True)
+        cls._thread.start()
+
+    @classmethod
+    def stop(cls):
+        cls._stop.set()
+
+    @classmethod
+    def record(cls, stall: dict):
+        """Store a stall and print it"""
+        cls.stalls.append(stall)
+        cls.stall_count += 1
+        where = stall["command"] or stall["location"] or stall["kind"]
+        duration = stall["duration_ms"]
+        took = f" for {duration:.0f}ms" if duration is not None else ""
+        print(f"\033[33mEvent loop blocked{took} in {where}\033[0m")
+        for line in stall["stack"][-6:]:
+            print(f"\033[33m    {line}\033[0m")
+
+    # --- Loop side ---
+
+    @classmethod
+    def _beat(cls, beat: threading.Event):
+        beat.set()
+        key = (tuple(cls._bot.extensions), len(MessageDispatcher._subscribers))
+        if key != cls._codes_key:
+            cls._refresh_codes()
+
+    @classmethod
+    def _refresh_codes(cls):
+        """Map callback code objects to command and handler names"""
+        codes = {}
+        for cmd in cls._bot.application_commands:
+            func = cmd.callback
+            while func is not None:
+                code = getattr(func, "__code__", None)
+                if code is not None:
+                    codes[code] = f"/{cmd.qualified_name}"
+                func = getattr(func, "__wrapped__", None)
+        for name, subscriber in MessageDispatcher._subscribers.items():
+            func = getattr(subscriber.callback, "__func__", subscriber.callback)
+            code = getattr(func, "__code__", None)
+            if code is not None:
+                codes[code] = f"handler {name}"
+        cls._codes = codes
+        cls._codes_key = (
+            tuple(cls._bot.extensions),
+            len(MessageDispatcher._subscribers),
+        )
+
+    # --- Watchdog thread ---
+
+    @classmethod
+    def _run(cls):
+        while not cls._stop.is_set():
+            beat = threading.Event()
+            sent = time.perf_counter()
+            try:
+                cls._loop.call_soon_threadsafe(cls._beat, beat)
+            except RuntimeError:
+                return  # loop closed
+
+            if not beat.wait(cls.threshold):
+                stall = cls._capture()
+                while not beat.wait(1.0):
+                    if cls._stop.is_set() or cls._loop.is_closed():
+                        return
+                stall["duration_ms"] = (time.perf_counter() - sent) * 1000
+                cls.record(stall)
+                try:
+                    cls._loop.call_soon_threadsafe(
+                        Telemetry.observe, "loop_stall", stall["duration_ms"]
+                    )
+                except RuntimeError:
+                    return
+
+            cls._stop.wait(cls.interval)
+
+    @classmethod
+    def _capture(cls) -> dict:
+        """Snapshot the loop thread's stack while it is blocked"""
+        frame = sys._current_frames().get(cls._loop_thread_id)
+        command = None
+        walk = frame
+        while walk is not None and command is None:
+            command = cls._codes.get(walk.f_code)
+            walk = walk.f_back
+
+        stack = traceback.extract_stack(frame) if frame else []
+        location = None
+        for entry in reversed(stack):
+            path = Path(entry.filename).resolve()
+            if ROOT in path.parents and "site-packages" not in path.parts:
+                location = f"{path.relative_to(ROOT)}:{entry.lineno} in {entry.name}"
+                break
+
+        return {
+            "kind": "stall",
+            "when": datetime.now(timezone.utc),
+            "duration_ms": None,
+            "command": command,
+            "location": location,
+            "stack": [
+                f"{Path(e.filename).name}:{e.lineno} in {e.name}" for e in stack[-12:]
+            ],
+        }
@@ -8,7 +8,15 @@ import yaml
 from disnake.ext import commands
 from dotenv import load_dotenv
 
+from Modules.Database import Database
+from Modules.Gateway import client_options
+from Modules.Instrumentation import CommandStats, instrument_http
 from Modules.Logger import Logger, setup_logger
+from Modules.MemoryTracker import MemoryTracker
+from Modules.MessageDispatcher import MessageDispatcher
+from Modules.Telemetry import Telemetry
+from Modules.Tracing import Tracer
+from Modules.Watchdog import Watchdog
 
 photo = """\033[32m hi\033[0m"""
 
@@ -30,12 +38,27 @@ with open(config_path, "r") as f:
     data = yaml.safe_load(f)
     GUILD_ID = data.get("guild_id")
     list_startup = data.get("list_startup", False)
+    watchdog_config = data.get("watchdog") or {}
+    metrics_config = data.get("metrics") or {}
+    tracing_config = data.get("tracing") or {}
+    memory_config = data.get("memory") or {}
+    gateway_config = data.get("gateway") or {}
 
 
-from Modules.Database import Database
+class THEMBot(commands.InteractionBot):
+    async def close(self):
+        await super().close()
+        # Write out the spans still buffered, usually the end of the last trace
+        await Tracer.stop()
+
+
+# Trace allocations before the bot and its caches are created
+if memory_config.get("tracemalloc", False):
+    MemoryTracker.start_tracing(memory_config.get("tracemalloc_frames", 1))
 
 # Create the bot without a command prefix since we're using ONLY slash commands.
-bot = commands.InteractionBot(intents=disnake.Intents.all())
+# Intents, member caching and chunking come from the gateway: profile
+bot = THEMBot(**client_options(gateway_config))
 bot.launch_time = time.time()  # Track when the bot started
 
 
@@ -47,6 +70,8 @@ async def load_cogs():
         "Cogs.Moderation",
         "Cogs.CTFtime",
         "Cogs.CTFother",
+        "Cogs.Admin",
+        "Cogs.AntiSpam",
     ]
 
     async def load_cog(cog):
@@ -84,6 +109,40 @@ async def init_bot():
         print(f"\033[31mFailed to initialize database: {e}\033[0m")
         sys.exit(1)
 
+    # Route on_message through one dispatcher before cogs subscribe to it
+    MessageDispatcher.attach(bot)
+
+    # Sample gateway, REST and event loop latency for /ping
+    Telemetry.start(bot)
+    # Time every command, attributing DB and REST time to the one behind it
+    CommandStats.attach(bot)
+    instrument_http(bot)
+    if tracing_config.get("enabled", False):
+        Tracer.start(
+            sample_rate=tracing_config.get("sample_rate", 0.1),
+            max_file_mb=tracing_config.get("max_file_mb", 50),
+        )
+    # Report anything that blocks the event loop, with the command behind it
+    if watchdog_config.get("enabled", True):
+        Watchdog.start(
+            bot,
+            threshold_ms=watchdog_config.get("stall_threshold_ms", 250),
+            interval_ms=watchdog_config.get("interval_ms", 500),
+            asyncio_debug=watchdog_config.get("asyncio_debug", False),
+        )
+
+    if metrics_config.get("enabled", False):
+        from Modules.MetricsServer import MetricsServer
+
+        try:
+            await MetricsServer.start(
+                bot,
+                host=metrics_config.get("host", "127.0.0.1"),
+                port=metrics_config.get("port", 9108),
+            )
+        except OSError as e:
+            print(f"\033[31mFailed to start metrics endpoint: {e}\033[0m")
+
     # Then load cogs
     await load_cogs()
 
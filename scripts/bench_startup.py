@@ -0,0 +1,172 @@
+"""Compare startup cost of the gateway profiles in Modules/Gateway.py
+
+Each run logs in with the bot token from .env in a fresh process, without
+loading cogs, and measures:
+- time until on_ready (which includes member chunking when it is enabled)
+- gateway events and decompressed bytes received until then and during a
+  settle period afterwards (presence updates show up here)
+- cached guilds, members and users, and RSS at the end
+
+Usage:
+    python scripts/bench_startup.py [--profiles minimal full config] [--runs 3]
+
+`config` benchmarks the gateway: section of config.yml as it is.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+
+ROOT = os.path.normpath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+import yaml  # noqa: E402
+from disnake.ext import commands  # noqa: E402
+from dotenv import load_dotenv  # noqa: E402
+
+from Modules.Gateway import PROFILES, client_options  # noqa: E402
+from Modules.Metrics import rss_bytes  # noqa: E402
+
+COLUMNS = [
+    ("ready_s", "ready", "{:.2f}s"),
+    ("events", "events", "{:,.0f}"),
+    ("mb_received", "received", "{:.1f}MB"),
+    ("settle_events", "settle events", "{:,.0f}"),
+    ("members", "members", "{:,.0f}"),
+    ("rss_mb", "RSS", "{:.0f}MB"),
+]
+
+
+def options_for(profile: str) -> dict:
+    if profile != "config":
+        return client_options({}, profile)
+    with open(os.path.join(ROOT, "config.yml"), "r") as f:
+        return client_options(yaml.safe_load(f).get("gateway"))
+
+
+async def measure(profile: str, settle: float) -> dict:
+    """Log in once with `profile` and report what startup cost"""
+    load_dotenv(os.path.join(ROOT, ".env"))
+    bot = commands.InteractionBot(**options_for(profile), enable_debug_events=True)
+    events = Counter()
+    received = [0]
+    ready = asyncio.Event()
+
+    @bot.event
+    async def on_socket_event_type(event_type):
+        events[event_type] += 1
+
+    @bot.event
+    async def on_socket_raw_receive(message):
+        received[0] += len(message)
+
+    @bot.event
+    async def on_ready():
+        ready.set()
+
+    start = time.perf_counter()
+    runner = asyncio.create_task(bot.start(os.getenv("TOKEN")))
+    waiter = asyncio.create_task(ready.wait())
+    try:
+        await asyncio.wait([runner, waiter], return_when=asyncio.FIRST_COMPLETED)
+        if runner.done():
+            waiter.cancel()
+            runner.result()  # login failed, raise it
+
+        ready_s = time.perf_counter() - start
+        at_ready = sum(events.values())
+        await asyncio.sleep(settle)
+
+        # Read the caches before close() can tear anything down
+        return {
+            "profile": profile,
+            "ready_s": ready_s,
+            "events": at_ready,
+            "mb_received": received[0] / 2**20,
+            "settle_events": sum(events.values()) - at_ready,
+            "top_events": dict(events.most_common(5)),
+            "guilds": len(bot.guilds),
+            "members": sum(len(guild.members) for guild in bot.guilds),
+            "users": len(bot.users),
+            "rss_mb": (rss_bytes() or 0) / 2**20,
+        }
+    finally:
+        await bot.close()
+
+
+def run_child(profile: str, settle: float) -> dict:
+    """Measure in a fresh interpreter so caches and RSS don't carry over"""
+    output = subprocess.run(
+        [
+            sys.executable,
+            __file__,
+            "--child",
+            profile,
+            "--settle",
+            str(settle),
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    for line in output.splitlines():
+        if line.startswith("RESULT "):
+            return json.loads(line[len("RESULT ") :])
+    raise RuntimeError(f"No result from {profile} run:\n{output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--profiles", nargs="+", default=["minimal", "full"], help="Profiles to run"
+    )
+    parser.add_argument("--runs", type=int, default=3, help="Runs per profile")
+    parser.add_argument(
+        "--settle",
+        type=float,
+        default=10.0,
+        help="Seconds to keep counting after ready",
+    )
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = asyncio.run(measure(args.child, args.settle))
+        print("RESULT " + json.dumps(result))
+        return
+
+    for profile in args.profiles:
+        if profile not in PROFILES and profile != "config":
+            parser.error(f"unknown profile {profile!r}")
+
+    results = {profile: [] for profile in args.profiles}
+    # Interleave profiles so network conditions affect them alike
+    for run in range(args.runs):
+        for profile in args.profiles:
+            result = run_child(profile, args.settle)
+            results[profile].append(result)
+            print(
+                f"run {run + 1} {profile:<8} ready {result['ready_s']:.2f}s, "
+                f"{result['events']:,} events, {result['members']:,} members, "
+                f"{result['rss_mb']:.0f}MB RSS"
+            )
+
+    print(f"\nMedian of {args.runs} runs")
+    print(f"{'profile':<10}" + "".join(f"{title:>15}" for _, title, _ in COLUMNS))
+    for profile, runs in results.items():
+        cells = [
+            fmt.format(statistics.median(run[key] for run in runs))
+            for key, _, fmt in COLUMNS
+        ]
+        print(f"{profile:<10}" + "".join(f"{cell:>15}" for cell in cells))
+        print(f"{'':<10}most frequent events: {runs[-1]['top_events']}")
+
+
+if __name__ == "__main__":
+    main()